@@ -0,0 +1,212 @@
+"""
+Per-category archive of published articles.
+
+Every article a category page publishes is recorded in the state store
+under the day it first appeared, and rendered as text-only archive pages
+(images rotate out of output/images) in the category's template:
+
+    output/archive/<key>/index.html        newest days, links to every listing page
+    output/archive/<key>/page-<n>.html     ARCHIVE_DAYS_PER_PAGE days each, oldest first
+    output/archive/<key>/<YYYY-MM-DD>.html articles first published that day
+
+Listing pages are numbered from the oldest day, so a run only re-renders
+today's day page, the listing page holding today (plus the previous one
+when today starts a new page, for its "newer" link) and the index: build
+cost stays proportional to the new articles, not to the archive's size.
+The archive is never cleared between batches; ``python archive.py
+--rebuild`` renders every page again from the state store.
+
+Archive pages sit two directories below the site root, so each gets a
+``<base href="../../">`` and all of its links are written from the root.
+"""
+
+import os
+import sys
+from datetime import datetime, date
+
+from categories import CATEGORIES, get_category
+from config import get_settings
+from content_utils import log
+from generate_html import load_template, iter_template, write_chunks_file, clean_headline, convert_to_pdf_url
+import state_store
+
+ARCHIVE_DIR = 'archive'
+
+
+def archive_path(category, name):
+    """Return an archive page's URL relative to the site root, e.g. 'archive/ml/page-2.html'."""
+    return f"{ARCHIVE_DIR}/{category['key']}/{name}"
+
+
+def index_url(category):
+    """Return the URL of a category's archive index, relative to the site root."""
+    return archive_path(category, 'index.html')
+
+
+def _load_archive_template(category):
+    """Return the category's compiled template with links resolved from the site root."""
+    chunks, slots = load_template(category['name'])
+    return (chunks[0].replace('<head>', '<head>\n  <base href="../../">', 1),) + chunks[1:], slots
+
+
+def _format_day(day):
+    return date.fromisoformat(day).strftime("%B %d, %Y")
+
+
+def _page_count(days, per_page):
+    return max(1, -(-len(days) // per_page))
+
+
+def _iter_day_articles(category, day):
+    """Yield the text-only markup of the articles archived on one day."""
+    yield f"""
+      <article class="featured-article">
+        <div class="category-tag">{category['name'].upper()} ARCHIVE</div>
+        <h1>{_format_day(day)}</h1>
+      </article>
+
+      <div class="articles-grid">
+"""
+    for art in state_store.archived_on(category['key'], day):
+        yield f"""        <article class="article">
+          <h2>{clean_headline(art['title'])}</h2>
+          <p class="summary">{art['blurb']}</p>
+          <a href="{convert_to_pdf_url(art['url'])}" target="_blank" class="read-more">Read Paper →</a>
+        </article>
+"""
+    yield '      </div>\n'
+
+
+def _iter_day_list(category, heading, days):
+    """Yield a listing of days (with article counts), linking to their day pages."""
+    yield f"""
+      <article class="featured-article">
+        <div class="category-tag">{category['name'].upper()} ARCHIVE</div>
+        <h1>{heading}</h1>
+      </article>
+
+      <div class="articles-grid">
+"""
+    for day, count in days:
+        yield f"""        <article class="article">
+          <h2><a href="{archive_path(category, day + '.html')}">{_format_day(day)}</a></h2>
+          <p class="summary">{count} article{'s' if count != 1 else ''}</p>
+        </article>
+"""
+    yield '      </div>\n'
+
+
+def _iter_nav(category, links):
+    """Yield sidebar navigation: (label, url) links, then the category's live page and archive index."""
+    links = links + [(f"Today's {category['name']}", category['output_file']),
+                     ("Archive index", index_url(category))]
+    if get_settings().search.enabled:
+        links.append(("Search all articles", 'search.html'))
+    for label, url in links:
+        yield f"""        <article class="sidebar-article">
+          <h3><a href="{url}">{label}</a></h3>
+        </article>
+"""
+
+
+def _write_page(category, name, articles, sidebar, day_label):
+    """Render one archive page into output/archive/<key>/name."""
+    path = os.path.join('output', *archive_path(category, name).split('/'))
+    write_chunks_file(iter_template(_load_archive_template(category), {
+        'articles': articles,
+        'sidebar': sidebar,
+        'date': day_label,
+    }), path)
+
+
+def render_day(category, day):
+    """Render the page of one archived day."""
+    _write_page(category, f"{day}.html", _iter_day_articles(category, day),
+                _iter_nav(category, []), _format_day(day))
+
+
+def render_listing_page(category, days, page, per_page):
+    """Render listing page number page (1 = oldest days) with links to its neighbours."""
+    pages = _page_count(days, per_page)
+    page_days = days[(page - 1) * per_page:page * per_page]
+    links = []
+    if page < pages:
+        links.append(("Newer days", archive_path(category, f"page-{page + 1}.html")))
+    if page > 1:
+        links.append(("Older days", archive_path(category, f"page-{page - 1}.html")))
+    heading = f"{_format_day(page_days[0][0])} – {_format_day(page_days[-1][0])}" if page_days else "No articles yet"
+    _write_page(category, f"page-{page}.html", _iter_day_list(category, heading, page_days),
+                _iter_nav(category, links), datetime.now().strftime("%B %d, %Y"))
+
+
+def render_index(category, days, per_page):
+    """Render the archive index: the newest listing page's days, newest first, and every listing page."""
+    pages = _page_count(days, per_page)
+    newest = list(reversed(days[(pages - 1) * per_page:]))
+    links = []
+    for page in range(pages, 0, -1):
+        page_days = days[(page - 1) * per_page:page * per_page]
+        if page_days:
+            links.append((f"{_format_day(page_days[0][0])} – {_format_day(page_days[-1][0])}",
+                          archive_path(category, f"page-{page}.html")))
+    _write_page(category, 'index.html', _iter_day_list(category, f"{category['name']} Archive", newest),
+                _iter_nav(category, links), datetime.now().strftime("%B %d, %Y"))
+
+
+def update_archive(category, articles, day=None):
+    """Archive a category page's articles and re-render only the archive pages they touch.
+
+    Returns the number of articles new to the archive.
+    """
+    if isinstance(category, str):
+        category = get_category(category)
+    day = day or date.today().isoformat()
+    per_page = max(1, get_settings().archive.days_per_page)
+
+    added = state_store.archive_articles(category['key'], articles, day)
+    days = state_store.archived_days(category['key'])
+    index_path = os.path.join('output', *index_url(category).split('/'))
+    if not days or (not added and os.path.exists(index_path)):
+        return 0
+
+    position = [d for d, _ in days].index(day) if added else len(days) - 1
+    page = position // per_page + 1
+    if added:
+        render_day(category, day)
+    render_listing_page(category, days, page, per_page)
+    if position % per_page == 0 and page > 1:
+        # A new listing page started: the previous one gains its "newer" link
+        render_listing_page(category, days, page - 1, per_page)
+    render_index(category, days, per_page)
+    log(f"Archived {added} {category['name']} articles under {day}")
+    return added
+
+
+def rebuild_archive(category):
+    """Render every archive page of a category from the state store."""
+    if isinstance(category, str):
+        category = get_category(category)
+    per_page = max(1, get_settings().archive.days_per_page)
+    days = state_store.archived_days(category['key'])
+    for day, _ in days:
+        render_day(category, day)
+    for page in range(1, _page_count(days, per_page) + 1):
+        render_listing_page(category, days, page, per_page)
+    render_index(category, days, per_page)
+    log(f"Rebuilt {category['name']} archive: {len(days)} days")
+
+
+def main(argv=None):
+    """Rebuild archives by category key, e.g. ``python archive.py --rebuild ml cv``."""
+    args = sys.argv[1:] if argv is None else argv
+    if '--rebuild' not in args:
+        print("Usage: python archive.py --rebuild [category keys]")
+        return 1
+    keys = [a for a in args if not a.startswith('--')] or [c['key'] for c in CATEGORIES]
+    for key in keys:
+        rebuild_archive(key)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Persistent store of per-article rewrite results.
+
+Results are keyed by versioned arXiv ID plus the prompt version from
+content_utils, so a paper that was already rewritten in an earlier run
+reuses its headline, blurb, image keyword and image, and only new papers
+(or new versions of a paper, or changed prompts) go to Ollama.
+"""
+
+import os
+import json
+import time
+
+from config import get_settings
+from content_utils import PROMPT_VERSION
+from concurrency import STATE_LOCK
+
+_results = None
+
+
+def result_key(article_id):
+    """Build the store key for an arXiv entry ID such as http://arxiv.org/abs/2506.05314v1."""
+    return f"{article_id.split('/abs/')[-1]}|{PROMPT_VERSION}"
+
+
+def _load():
+    """Load the store from disk once per process."""
+    global _results
+    if _results is None:
+        try:
+            with open(get_settings().cache.article_store_file, 'r', encoding='utf-8') as f:
+                _results = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _results = {}
+    return _results
+
+
+def get_result(article_id):
+    """Return the stored result for an article, or None if it hasn't been processed."""
+    with STATE_LOCK:
+        result = _load().get(result_key(article_id))
+        return dict(result) if result else None
+
+
+def put_result(article_id, result):
+    """Record the rewrite result for an article (kept in memory until save_results)."""
+    with STATE_LOCK:
+        _load()[result_key(article_id)] = dict(result, updated_at=time.time())
+
+
+def save_results():
+    """Prune expired results and atomically write the store to disk."""
+    settings = get_settings().cache
+    store_file = settings.article_store_file
+    cutoff = time.time() - settings.article_store_retention_days * 86400
+    with STATE_LOCK:
+        results = _load()
+        for key in [k for k, v in results.items() if v.get('updated_at', 0) < cutoff]:
+            del results[key]
+
+        os.makedirs(os.path.dirname(store_file) or '.', exist_ok=True)
+        tmp_path = f"{store_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+        os.replace(tmp_path, store_file)
@@ -0,0 +1,140 @@
+"""
+arXiv fetch stage.
+
+A batch issues one combined ``cat:cs.AI OR cat:cs.LG OR ...`` query (paged
+as needed), parses each page once and routes entries to categories by their
+primary and cross-listed category tags, instead of one request per category.
+Responses go through feed_cache, and each category's entries are compared
+with the fingerprint of the entries its current page was built from, so
+categories whose entries didn't change can be skipped downstream.
+"""
+
+import json
+import hashlib
+from urllib.parse import urlencode
+
+from config import ARXIV_QUERY_URL, get_settings
+from content_utils import log
+from concurrency import limit
+from feed_cache import fetch_feed
+import state_store
+
+
+def entry_to_article(entry):
+    """Convert a feedparser entry into the article dict used by the pipeline."""
+    return {
+        'id': entry.id,
+        'title': entry.title.strip(),
+        'summary': entry.summary.strip(),
+        'published': entry.published,
+        'updated': entry.get('updated', entry.published),
+    }
+
+
+def articles_fingerprint(articles):
+    """Hash the (id, updated) pairs of a category's entries, in order."""
+    pairs = [(a['id'], a.get('updated', a.get('published'))) for a in articles]
+    return hashlib.sha256(json.dumps(pairs).encode('utf-8')).hexdigest()
+
+
+def entries_changed(category, articles):
+    """Return False if a category's page was last built from exactly these entries."""
+    return articles_fingerprint(articles) != state_store.page_fingerprint(category['key'])
+
+
+def entry_categories(entry):
+    """Return the arXiv category codes of an entry, primary category first."""
+    codes = []
+    primary = entry.get('arxiv_primary_category', {}).get('term')
+    if primary:
+        codes.append(primary)
+    for tag in entry.get('tags', []):
+        term = tag.get('term')
+        if term and term not in codes:
+            codes.append(term)
+    return codes
+
+
+def build_query_url(categories, start=0, max_results=None):
+    """Build an arXiv API URL covering every given category in one query.
+
+    max_results defaults to the ARXIV_PAGE_SIZE setting.
+    """
+    if max_results is None:
+        max_results = get_settings().arxiv.page_size
+    search_query = ' OR '.join(f"cat:{c['arxiv_category']}" for c in categories)
+    params = {
+        'search_query': search_query,
+        'sortBy': 'lastUpdatedDate',
+        'sortOrder': 'descending',
+        'start': start,
+        'max_results': max_results,
+    }
+    return f"{ARXIV_QUERY_URL}?{urlencode(params)}"
+
+
+def fetch_category(category, max_results):
+    """Fetch recent entries for a single category using its own feed URL.
+
+    Returns:
+        Tuple of (articles, changed) where changed is False when the category's
+        page was built from the same entries (see entries_changed).
+    """
+    log(f"Fetching recent {category['name']} arXiv entries...")
+    with limit('arxiv'):
+        feed = fetch_feed(category['feed_url'])
+    articles = [entry_to_article(entry) for entry in feed.entries[:max_results]]
+    log(f"Fetched {len(articles)} {category['name']} entries from arXiv.")
+    return articles, entries_changed(category, articles)
+
+
+def fetch_batch(categories, max_per_category):
+    """Fetch recent entries for all categories with a combined, paged query.
+
+    Returns a tuple of two dicts keyed by category key: the list of article
+    dicts in the feed's order, and whether that category's entries differ from
+    the ones its current page was built from. Categories still short of ``max_per_category`` after
+    ARXIV_MAX_PAGES pages (see config.ArxivSettings) fall back to their own per-category query.
+    """
+    by_code = {c['arxiv_category']: c['key'] for c in categories}
+    routed = {c['key']: [] for c in categories}
+    requests_made = 0
+    entries_parsed = 0
+
+    settings = get_settings().arxiv
+    log(f"Fetching recent arXiv entries for {len(categories)} categories in one query...")
+    for page in range(settings.max_pages):
+        url = build_query_url(categories, start=page * settings.page_size)
+        with limit('arxiv'):
+            feed = fetch_feed(url)
+        requests_made += 1
+        entries_parsed += len(feed.entries)
+
+        for entry in feed.entries:
+            article = None
+            for code in entry_categories(entry):
+                key = by_code.get(code)
+                if key is None or len(routed[key]) >= max_per_category:
+                    continue
+                if article is None:
+                    article = entry_to_article(entry)
+                routed[key].append(article)
+
+        if all(len(articles) >= max_per_category for articles in routed.values()):
+            break
+        if len(feed.entries) < settings.page_size:
+            # Reached the end of the result set
+            break
+
+    log(f"Parsed {entries_parsed} arXiv entries from {requests_made} request(s).")
+
+    changed = {}
+    for category in categories:
+        if len(routed[category['key']]) < max_per_category:
+            log(f"Only {len(routed[category['key']])} {category['name']} entries in combined feed; "
+                f"falling back to category query")
+            routed[category['key']], changed[category['key']] = fetch_category(category, max_per_category)
+        else:
+            changed[category['key']] = entries_changed(category, routed[category['key']])
+
+    return routed, changed
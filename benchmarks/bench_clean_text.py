@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for text_cleaner against the original clean_generated_text.
+
+Runs every sample in a corpus of Ollama outputs through the original
+implementation (copied below as the reference) and through the compiled
+cleaner, verifies the default rule set produces identical results, reports
+where the per-task rule sets intentionally differ, and measures throughput.
+
+Usage:
+    python benchmarks/bench_clean_text.py [corpus.json] [--iterations N]
+
+The corpus is a JSON list of {"task": "headline"|"blurb"|"keyword", "text": ...}.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import text_cleaner  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ollama_outputs.json')
+
+
+def legacy_clean(text):
+    """The original content_utils.clean_generated_text, kept verbatim as the reference."""
+    if not text:
+        return "[Generation failed]"
+
+    cleaned = text.strip()
+
+    narrative_patterns = [
+        r'^Here.*?:',
+        r'^Two sentences.*?:',
+        r'^Explanation.*?:',
+        r'^Story.*?:',
+        r'^Headline.*?:',
+        r'^\*\*.*?\*\*',
+        r'^Style \d+.*?:',
+        r'^Option \d+.*?:',
+        r'^Possible.*?:',
+        r'^This headline.*',
+        r'^I removed.*',
+        r'^I also.*',
+        r'^The word.*',
+        r'^\d+\.\s*\*\*.*?\*\*',
+        r'^\d+\.\s*".*?"',
+        r'^\d+\.\s+',
+        r'\(I.*?\)',
+        r'This headline.*',
+        r'The focus is.*',
+        r'rather than.*',
+    ]
+
+    for pattern in narrative_patterns:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
+
+    cleaned = cleaned.strip('"').strip("'").strip()
+
+    cleaned = re.sub(r'\n\s*\n', ' ', cleaned)
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+
+    if any(phrase in cleaned.lower() for phrase in ['this headline', 'the word', 'i removed', 'the focus']):
+        for split_phrase in [' This headline', ' The word', ' I removed', ' The focus', ' (I']:
+            if split_phrase in cleaned:
+                cleaned = cleaned.split(split_phrase)[0].strip()
+                break
+
+    sentences = re.split(r'[.!?]+', cleaned)
+    if len(sentences) >= 2:
+        cleaned = '. '.join(sentences[:2]).strip() + '.'
+    elif len(sentences) == 1 and sentences[0].strip():
+        cleaned = sentences[0].strip() + '.'
+
+    return cleaned.strip()
+
+
+def throughput(func, texts, iterations):
+    """Return cleaned texts per second for func over the corpus."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return iterations * len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='?', default=DEFAULT_CORPUS)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        samples = json.load(f)
+    texts = [s['text'] for s in samples]
+
+    # The default rule set must match the original implementation exactly
+    mismatches = [t for t in texts if text_cleaner.clean(t) != legacy_clean(t)]
+    print(f"Corpus: {len(samples)} samples from {args.corpus}")
+    print(f"Default rules identical to original: {len(texts) - len(mismatches)}/{len(texts)}")
+    for text in mismatches:
+        print(f"  MISMATCH {text!r}\n    original: {legacy_clean(text)!r}\n    compiled: {text_cleaner.clean(text)!r}")
+
+    # Per-task rule sets differ on purpose (e.g. blurbs keep "rather than ..." prose)
+    for sample in samples:
+        task_result = text_cleaner.clean(sample['text'], sample['task'])
+        if task_result != legacy_clean(sample['text']):
+            print(f"  {sample['task']:8} rules differ: {legacy_clean(sample['text'])!r} -> {task_result!r}")
+
+    legacy_rate = throughput(legacy_clean, texts, args.iterations)
+    compiled_rate = throughput(text_cleaner.clean, texts, args.iterations)
+    print(f"Original: {legacy_rate:10.0f} texts/s")
+    print(f"Compiled: {compiled_rate:10.0f} texts/s ({compiled_rate / legacy_rate:.1f}x)")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
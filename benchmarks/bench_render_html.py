@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Benchmark for generate_html's compiled templates against the original renderer.
+
+Renders synthetic category pages (a featured article with an image, a grid
+of thumbnails and the sidebar) with the original implementation (copied
+below as the reference: it reads the template file on every call, builds
+the page with += and runs a str.replace pass per placeholder) and with the
+compiled, cached templates, verifies both produce identical pages, and
+measures pages rendered per second. It also reports the peak memory of
+writing one page as a string versus streaming it with write_html.
+
+Usage:
+    python benchmarks/bench_render_html.py [--pages N] [--articles N] [--category NAME]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from categories import DEFAULT_TEMPLATE, get_category  # noqa: E402
+import generate_html  # noqa: E402
+
+
+def legacy_load_template(category="AI Research"):
+    """The original load_template: reads the template file on every call."""
+    try:
+        template_name = get_category(category).get('template', DEFAULT_TEMPLATE)
+    except KeyError:
+        template_name = DEFAULT_TEMPLATE
+    template_path = os.path.join(generate_html.TEMPLATES_DIR, template_name)
+
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def legacy_generate_html(articles, category="AI Research"):
+    """The original generate_html, kept verbatim as the reference."""
+    template = legacy_load_template(category)
+
+    # Separate featured article (only one) and others
+    featured = None
+    others = []
+    for art in articles:
+        if art.get('featured'):
+            featured = art
+        else:
+            others.append(art)
+    # If no article explicitly featured, default to first
+    if featured is None and articles:
+        featured = articles[0]
+        others = articles[1:]
+
+    # Split others into main content and sidebar articles
+    # Move last 3 articles to sidebar, keep the rest in main content
+    if len(others) > 3:
+        main_articles = others[:-3]  # All but last 3
+        sidebar_articles = others[-3:]  # Last 3
+    else:
+        main_articles = []
+        sidebar_articles = others  # All remaining articles go to sidebar
+
+    # Build HTML segments for main content
+    html_segments = ""
+    
+    # Featured article section
+    if featured:
+        image_html = ""
+        if featured.get('image'):
+            img = featured['image']
+            credit_html = ""
+            if img.get('credit'):
+                # Unsplash requires attribution to both photographer and Unsplash with UTM parameters
+                credit_html = f'''<div class="photo-credit">
+                    <a href="{img.get("credit_link", "#")}" target="_blank">{img["credit"]}</a> •
+                    <a href="{img.get("unsplash_link", "https://unsplash.com/?utm_source=arxiv_aggregator&utm_medium=referral")}" target="_blank">Unsplash</a>
+                </div>'''
+            image_html = f"""
+        <div class="featured-image">
+          {generate_html.picture_html(img, 'article-img')}
+          {credit_html}
+        </div>"""
+        
+        html_segments += f"""
+      <article class="featured-article">
+        <div class="category-tag">FEATURED {category.upper()}</div>
+        <h1>{generate_html.clean_headline(featured['title'])}</h1>
+        <div class="byline">From arXiv • Latest Research</div>{image_html}
+        <p class="summary">{featured['blurb']}</p>
+        <a href="{generate_html.convert_to_pdf_url(featured['url'])}" target="_blank" class="read-more">Read Full Paper →</a>
+      </article>
+"""
+
+    # Regular articles grid (main content)
+    if main_articles:
+        html_segments += '\n      <div class="articles-grid">\n'
+        for art in main_articles:
+            image_html = ""
+            if art.get('image'):
+                img = art['image']
+                credit_html = ""
+                if img.get('credit'):
+                    # Unsplash requires attribution to both photographer and Unsplash with UTM parameters
+                    credit_html = f'''<div class="photo-credit-small">
+                        <a href="{img.get("credit_link", "#")}" target="_blank">{img["credit"]}</a> •
+                        <a href="{img.get("unsplash_link", "https://unsplash.com/?utm_source=arxiv_aggregator&utm_medium=referral")}" target="_blank">Unsplash</a>
+                    </div>'''
+                image_html = f"""
+          <div class="article-thumbnail">
+            {generate_html.picture_html(img, 'thumbnail-img')}
+            {credit_html}
+          </div>"""
+            
+            html_segments += f"""        <article class="article">
+          {image_html}
+          <h2>{generate_html.clean_headline(art['title'])}</h2>
+          <p class="summary">{art['blurb']}</p>
+          <a href="{generate_html.convert_to_pdf_url(art['url'])}" target="_blank" class="read-more">Read Paper →</a>
+        </article>
+"""
+        html_segments += '      </div>\n'
+
+    # Build sidebar articles HTML
+    sidebar_html = ""
+    if sidebar_articles:
+        for art in sidebar_articles:
+            sidebar_html += f"""        <article class="sidebar-article">
+          <h3><a href="{generate_html.convert_to_pdf_url(art['url'])}" target="_blank">{generate_html.clean_headline(art['title'])}</a></h3>
+          <p class="summary">{art['blurb']}</p>
+          <a href="{generate_html.convert_to_pdf_url(art['url'])}" target="_blank" class="read-more">Read Paper →</a>
+        </article>
+"""
+
+    # Replace placeholders
+    html = template.replace("<!--ARTICLES_PLACEHOLDER-->", html_segments)
+    html = html.replace("<!--SIDEBAR_ARTICLES_PLACEHOLDER-->", sidebar_html)
+
+    # Insert current date
+    today = datetime.now().strftime("%B %d, %Y")
+    html = html.replace('{date}', today)
+    return html
+
+
+def sample_articles(count):
+    """Build count article dicts shaped like pipeline.process_article's output."""
+    articles = []
+    for i in range(count):
+        image = None
+        if i < count - 3:
+            name = f"article_{i:08x}"
+            image = {
+                'path': f"images/{name}.jpg",
+                'srcset': {
+                    mime: f"images/{name}.{ext} 1x, images/{name}@2x.{ext} 2x"
+                    for mime, ext in (('image/avif', 'avif'), ('image/webp', 'webp'), ('image/jpeg', 'jpg'))
+                },
+                'alt_text': f"Photo related to paper {i}",
+                'credit': f"Photo by Photographer {i} on Unsplash",
+                'credit_link': f"https://unsplash.com/@photographer{i}?utm_source=arxiv_aggregator&utm_medium=referral",
+                'unsplash_link': "https://unsplash.com/?utm_source=arxiv_aggregator&utm_medium=referral",
+            }
+        articles.append({
+            'id': f"2501.{i:05d}",
+            'title': f"Researchers Teach Model {i} to Reason About Long Documents.",
+            'blurb': f"A new method lets model {i} keep track of facts across thousands of pages. "
+                     f"It beats earlier baselines while using a fraction of the memory.",
+            'url': f"http://arxiv.org/abs/2501.{i:05d}v1",
+            'featured': i == 0,
+            'image': image,
+        })
+    return articles
+
+
+def throughput(render, articles, category, pages):
+    """Return pages rendered per second."""
+    start = time.perf_counter()
+    for _ in range(pages):
+        render(articles, category=category)
+    return pages / (time.perf_counter() - start)
+
+
+def peak_memory(write):
+    """Return the peak bytes allocated while write(devnull) runs."""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        tracemalloc.start()
+        write(devnull)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=5000)
+    parser.add_argument('--articles', type=int, default=12)
+    parser.add_argument('--category', default="AI Research")
+    args = parser.parse_args()
+
+    # Templates are looked up relative to the repository root
+    os.chdir(ROOT)
+    articles = sample_articles(args.articles)
+
+    identical = legacy_generate_html(articles, args.category) == generate_html.generate_html(articles, args.category)
+    print(f"Rendering {args.pages} pages of {args.articles} articles ({args.category})")
+    print(f"Output identical to original: {identical}")
+
+    legacy_rate = throughput(legacy_generate_html, articles, args.category, args.pages)
+    compiled_rate = throughput(generate_html.generate_html, articles, args.category, args.pages)
+    print(f"Original: {legacy_rate:10.0f} pages/s")
+    print(f"Compiled: {compiled_rate:10.0f} pages/s ({compiled_rate / legacy_rate:.1f}x)")
+
+    string_peak = peak_memory(lambda out: out.write(generate_html.generate_html(articles, args.category)))
+    stream_peak = peak_memory(lambda out: generate_html.write_html(articles, out, args.category))
+    print(f"Peak memory writing one page: string {string_peak / 1024:.0f} KB, "
+          f"streamed {stream_peak / 1024:.0f} KB")
+
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Registry of arXiv categories published by the aggregator.
+
+Each category is a plain descriptor dict consumed by pipeline.run_category.
+Adding a new category means adding an entry here (and a template), not a
+new aggregator module.
+"""
+
+from config import (
+    ARXIV_API_URL,
+    ARXIV_ML_URL,
+    ARXIV_CV_URL,
+    ARXIV_CR_URL,
+    ARXIV_RO_URL,
+    ARXIV_HC_URL,
+)
+
+# Descriptor fields:
+#   key          - short identifier used on the command line
+#   name         - display name passed to generate_html
+#   topic        - plain-language topic passed to the LLM prompts
+#   arxiv_category - arXiv category code (e.g. cs.AI)
+#   feed_url     - arXiv API query URL for this category
+#   output_file  - page written to output/
+#   template     - HTML template in templates/
+#   skip_seen    - only process articles not published by a previous run
+CATEGORIES = [
+    {
+        'key': 'ai',
+        'name': 'AI Research',
+        'topic': 'artificial intelligence',
+        'arxiv_category': 'cs.AI',
+        'feed_url': ARXIV_API_URL,
+        'output_file': 'index.html',
+        'template': 'base_template.html',
+        'skip_seen': True,
+    },
+    {
+        'key': 'ml',
+        'name': 'Machine Learning',
+        'topic': 'machine learning',
+        'arxiv_category': 'cs.LG',
+        'feed_url': ARXIV_ML_URL,
+        'output_file': 'ml.html',
+        'template': 'ml_template.html',
+        'skip_seen': False,
+    },
+    {
+        'key': 'cv',
+        'name': 'Computer Vision',
+        'topic': 'computer vision',
+        'arxiv_category': 'cs.CV',
+        'feed_url': ARXIV_CV_URL,
+        'output_file': 'cv.html',
+        'template': 'cv_template.html',
+        'skip_seen': False,
+    },
+    {
+        'key': 'cr',
+        'name': 'Security/Cryptography',
+        'topic': 'security and cryptography',
+        'arxiv_category': 'cs.CR',
+        'feed_url': ARXIV_CR_URL,
+        'output_file': 'cr.html',
+        'template': 'cr_template.html',
+        'skip_seen': False,
+    },
+    {
+        'key': 'ro',
+        'name': 'Robotics',
+        'topic': 'robotics',
+        'arxiv_category': 'cs.RO',
+        'feed_url': ARXIV_RO_URL,
+        'output_file': 'ro.html',
+        'template': 'ro_template.html',
+        'skip_seen': False,
+    },
+    {
+        'key': 'hc',
+        'name': 'Human-Computer Interaction',
+        'topic': 'human-computer interaction',
+        'arxiv_category': 'cs.HC',
+        'feed_url': ARXIV_HC_URL,
+        'output_file': 'hc.html',
+        'template': 'hc_template.html',
+        'skip_seen': True,
+    },
+]
+
+DEFAULT_TEMPLATE = 'base_template.html'
+
+
+def get_category(key_or_name):
+    """Look up a category descriptor by key (e.g. 'ml') or display name."""
+    for category in CATEGORIES:
+        if key_or_name in (category['key'], category['name']):
+            return category
+    raise KeyError(f"Unknown category: {key_or_name}")
+
+
+def output_files():
+    """Return the page filenames written by all registered categories."""
+    return [category['output_file'] for category in CATEGORIES]
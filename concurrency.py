@@ -0,0 +1,70 @@
+"""
+Shared concurrency limits for external dependencies.
+
+All aggregators running in one process share a single semaphore per
+external service, so scheduling every category at once never sends more
+simultaneous requests to arXiv, Ollama, Unsplash or the FTP server than
+configured (see the *_MAX_CONCURRENCY settings in config.py). Semaphores
+are created on first use, from the settings active at that point.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import get_settings
+
+# Dependencies limited here; each has a config section with a max_concurrency setting
+DEPENDENCIES = ('arxiv', 'ollama', 'unsplash', 'ftp')
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+_last_call = {}
+_interval_lock = threading.Lock()
+
+# Guards read-modify-write cycles on the shared JSON state files
+STATE_LOCK = threading.RLock()
+
+
+def dependency_limit(dependency):
+    """Return the maximum number of simultaneous calls to a dependency."""
+    return get_settings().section(dependency).max_concurrency
+
+
+def min_interval(dependency):
+    """Return the minimum number of seconds between the start of two calls to a dependency."""
+    # arXiv asks API clients to wait 3 seconds between requests
+    return get_settings().arxiv.min_interval if dependency == 'arxiv' else 0
+
+
+def _semaphore(dependency):
+    with _semaphores_lock:
+        semaphore = _semaphores.get(dependency)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, dependency_limit(dependency)))
+            _semaphores[dependency] = semaphore
+        return semaphore
+
+
+def _wait_for_interval(dependency):
+    """Sleep until the minimum interval since the previous call has elapsed."""
+    interval = min_interval(dependency)
+    if interval <= 0:
+        return
+    with _interval_lock:
+        now = time.monotonic()
+        next_allowed = _last_call.get(dependency, 0) + interval
+        start = max(now, next_allowed)
+        _last_call[dependency] = start
+    if start > now:
+        time.sleep(start - now)
+
+
+@contextmanager
+def limit(dependency):
+    """Hold one of the concurrency slots for an external dependency."""
+    if dependency not in DEPENDENCIES:
+        raise KeyError(dependency)
+    with _semaphore(dependency):
+        _wait_for_interval(dependency)
+        yield
@@ -1,9 +1,14 @@
 # config.py - Configuration settings for arXiv aggregator
+#
+# Settings are read lazily: nothing is parsed or validated at import time.
+# get_settings() loads .env and the environment on first use, and each
+# section (ftp, unsplash, ollama, ...) is parsed and validated the first
+# time a stage reads it, so a stage that never publishes over FTP never
+# needs FTP credentials. Tests and benchmarks can install their own values
+# with configure(Settings.from_dict({...})).
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+import threading
+from dataclasses import dataclass, field, fields
 
 # ArXiv API URL for fetching recent cs.AI papers (Atom feed)
 ARXIV_API_URL = "http://export.arxiv.org/api/query?search_query=cat:cs.AI&sortBy=lastUpdatedDate&sortOrder=descending&max_results=8&start=0"
@@ -11,35 +16,290 @@ ARXIV_ML_URL = "http://export.arxiv.org/api/query?search_query=cat:cs.LG&&sortBy
 ARXIV_CV_URL = "http://export.arxiv.org/api/query?search_query=cat:cs.CV&sortBy=lastUpdatedDate&sortOrder=descending&max_results=8&start=0"
 ARXIV_RO_URL = "https://export.arxiv.org/api/query?search_query=cat:cs.RO&sortBy=lastUpdatedDate&sortOrder=descending&max_results=8&start=0"
 ARXIV_CR_URL = "https://export.arxiv.org/api/query?search_query=cat:cs.CR&pysortBy=lastUpdatedDate&sortOrder=descending&max_results=8&start=0"
+ARXIV_HC_URL = "http://export.arxiv.org/api/query?search_query=cat:cs.HC&start=0&max_results=8&sortBy=submittedDate&sortOrder=descending"
 
-# Local JSON file to track which arXiv IDs have already been processed
-SEEN_IDS_FILE = "seen_arxiv_ids.json"
+# Combined batch query (arxiv_fetch.py): one query for all categories, paged
+ARXIV_QUERY_URL = "http://export.arxiv.org/api/query"
 
-# Ollama configuration (loaded from environment variables with fallbacks)
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-OLLAMA_VISION_MODEL = os.getenv("OLLAMA_VISION_MODEL", "llava:latest")
-OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
-OLLAMA_CHAT_API_URL = os.getenv("OLLAMA_CHAT_API_URL", "http://localhost:11434/api/chat")
-
-# FTP server configuration (loaded from environment variables)
-FTP_HOST = os.getenv("FTP_HOST")
-FTP_USER = os.getenv("FTP_USER")
-FTP_PASS = os.getenv("FTP_PASS")
-FTP_REMOTE_DIR = os.getenv("FTP_REMOTE_DIR", ".")
-
-# Unsplash API configuration (loaded from environment variables)
-UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY")
-UNSPLASH_SECRET_KEY = os.getenv("UNSPLASH_SECRET_KEY")
-UNSPLASH_APPLICATION_ID = os.getenv("UNSPLASH_APPLICATION_ID")
 UNSPLASH_API_URL = "https://api.unsplash.com"
 
-# Validation: Ensure required environment variables are set
-required_env_vars = [
-    "FTP_HOST", "FTP_USER", "FTP_PASS",
-    "UNSPLASH_ACCESS_KEY", "UNSPLASH_SECRET_KEY", "UNSPLASH_APPLICATION_ID"
-]
+# Legacy JSON files, imported into the state database the first time it is created
+SEEN_IDS_FILE = "seen_arxiv_ids.json"
+FEATURED_IDS_FILE = "featured_arxiv_ids.json"
+
+
+def setting(env, default=None, required=False, item=str):
+    """Declare a settings field read from an environment variable.
+
+    default is the raw string used when the variable is unset (or a function
+    of the raw values, for defaults that depend on other variables); item is
+    the element type of tuple fields, which are written comma-separated.
+    """
+    return field(metadata={'env': env, 'default': default, 'required': required, 'item': item})
+
+
+def _parse(raw, kind, item):
+    """Convert a raw string value to a field's type."""
+    if kind is bool:
+        return raw.strip().lower() in ('1', 'true', 'yes', 'on')
+    if kind is tuple:
+        return tuple(item(part.strip()) for part in raw.split(',') if part.strip())
+    return kind(raw)
+
+
+@dataclass(frozen=True)
+class ArxivSettings:
+    page_size: int = setting("ARXIV_PAGE_SIZE", "100")
+    max_pages: int = setting("ARXIV_MAX_PAGES", "3")
+    max_concurrency: int = setting("ARXIV_MAX_CONCURRENCY", "1")
+    # arXiv asks API clients to wait 3 seconds between requests
+    min_interval: float = setting("ARXIV_MIN_INTERVAL", "3")
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """On-disk caches (arXiv responses, rewrites, Unsplash photos, Ollama responses)."""
+    dir: str = setting("CACHE_DIR", "cache")
+    # Per-article rewrite results reused across runs (article_store.py)
+    article_store_retention_days: int = setting("ARTICLE_STORE_RETENTION_DAYS", "30")
+    # Unsplash search results and processed photos reused across runs (unsplash_cache.py); kept
+    # here rather than with the Unsplash keys so pruning the cache never requires credentials
+    unsplash_search_ttl_hours: int = setting("UNSPLASH_SEARCH_TTL_HOURS", "24")
+    unsplash_image_ttl_days: int = setting("UNSPLASH_IMAGE_TTL_DAYS", "30")
+
+    @property
+    def feed_dir(self):
+        return os.path.join(self.dir, "feeds")
+
+    @property
+    def article_store_file(self):
+        return os.path.join(self.dir, "article_results.json")
+
+    @property
+    def llm_cache_file(self):
+        return os.path.join(self.dir, "llm_cache.sqlite3")
+
+    @property
+    def unsplash_cache_file(self):
+        return os.path.join(self.dir, "unsplash_searches.json")
+
+    @property
+    def unsplash_image_dir(self):
+        return os.path.join(self.dir, "images")
+
+    @property
+    def search_metrics_file(self):
+        return os.path.join(self.dir, "search_index_metrics.jsonl")
+
+
+@dataclass(frozen=True)
+class LLMCacheSettings:
+    """Ollama response cache (llm_cache.py)."""
+    enabled: bool = setting("LLM_CACHE_ENABLED", "1")
+    refresh: bool = setting("LLM_CACHE_REFRESH", "0")  # regenerate and overwrite cached responses
+    ttl_days: int = setting("LLM_CACHE_TTL_DAYS", "30")
+    max_entries: int = setting("LLM_CACHE_MAX_ENTRIES", "5000")
+
+
+@dataclass(frozen=True)
+class StateSettings:
+    """SQLite database (WAL mode) holding seen and featured arXiv IDs (state_store.py)."""
+    db_file: str = setting("STATE_DB_FILE", "arxiv_state.sqlite3")
+    # Seen papers are forgotten after this many days, or beyond this many entries
+    seen_retention_days: int = setting("SEEN_RETENTION_DAYS", "90")
+    seen_max_entries: int = setting("SEEN_MAX_ENTRIES", "20000")
+
+
+@dataclass(frozen=True)
+class OllamaSettings:
+    model: str = setting("OLLAMA_MODEL", "llama3.1:8b")
+    vision_model: str = setting("OLLAMA_VISION_MODEL", "llava:latest")
+    api_url: str = setting("OLLAMA_API_URL", "http://localhost:11434/api/generate")
+    chat_api_url: str = setting("OLLAMA_CHAT_API_URL", "http://localhost:11434/api/chat")
+    # Local generation can take minutes on slow hardware
+    read_timeout: float = setting("OLLAMA_READ_TIMEOUT", "300")
+    # Ask for headline, blurb and image keyword in one JSON-mode request per article
+    combined_mode: bool = setting("OLLAMA_COMBINED_MODE", "0")
+    # Read Ollama responses as a line-delimited stream instead of one JSON document
+    stream: bool = setting("OLLAMA_STREAM", "0")
+    max_concurrency: int = setting("OLLAMA_MAX_CONCURRENCY", lambda values: values.get("OLLAMA_NUM_PARALLEL") or "1")
+
+
+@dataclass(frozen=True)
+class UnsplashSettings:
+    access_key: str = setting("UNSPLASH_ACCESS_KEY", required=True)
+    secret_key: str = setting("UNSPLASH_SECRET_KEY", required=True)
+    application_id: str = setting("UNSPLASH_APPLICATION_ID", required=True)
+    max_concurrency: int = setting("UNSPLASH_MAX_CONCURRENCY", "2")
+
+
+@dataclass(frozen=True)
+class ImageSettings:
+    """Image stage: parallel Unsplash downloads and worker processes for resizing (0 = resize in threads)."""
+    download_workers: int = setting("IMAGE_DOWNLOAD_WORKERS", "4")
+    process_workers: int = setting("IMAGE_PROCESS_WORKERS", lambda values: str(min(4, os.cpu_count() or 1)))
+    # Modern formats written next to the JPEG fallback (skipped if Pillow can't encode them) and pixel densities
+    formats: tuple = setting("IMAGE_FORMATS", "avif,webp")
+    densities: tuple = setting("IMAGE_DENSITIES", "1,2", item=int)
+
+
+@dataclass(frozen=True)
+class ArchiveSettings:
+    """Per-category archive pages under output/archive/ (archive.py)."""
+    enabled: bool = setting("ARCHIVE_ENABLED", "1")
+    days_per_page: int = setting("ARCHIVE_DAYS_PER_PAGE", "30")
+
+
+@dataclass(frozen=True)
+class SearchSettings:
+    """Static full-text search index under output/search/ (search_index.py)."""
+    enabled: bool = setting("SEARCH_ENABLED", "1")
+    # Changing either rebuilds the index on the next run
+    term_shards: int = setting("SEARCH_TERM_SHARDS", "64")
+    docs_per_shard: int = setting("SEARCH_DOCS_PER_SHARD", "500")
+
+
+@dataclass(frozen=True)
+class CompressSettings:
+    """Precompressed .gz/.br siblings of text output files (precompress.py)."""
+    formats: tuple = setting("COMPRESS_FORMATS", "gzip,br")  # br needs the optional brotli package
+    gzip_level: int = setting("COMPRESS_GZIP_LEVEL", "9")
+    brotli_level: int = setting("COMPRESS_BROTLI_LEVEL", "11")
+    workers: int = setting("COMPRESS_WORKERS", lambda values: str(min(4, os.cpu_count() or 1)))
+    extensions: tuple = setting("COMPRESS_EXTENSIONS", ".html,.css,.js,.json,.svg,.xml")
+
+
+@dataclass(frozen=True)
+class PublishSettings:
+    """Publishing (publisher.py): "ftp", "local" (sync into local_dir) or "tarball" (write tarball)."""
+    backend: str = setting("PUBLISH_BACKEND", "ftp")
+    local_dir: str = setting("PUBLISH_LOCAL_DIR", "public")
+    tarball: str = setting("PUBLISH_TARBALL", os.path.join("dist", "site.tar.gz"))
+    # Manifest of published file hashes kept in the target
+    manifest_file: str = setting("PUBLISH_MANIFEST_FILE", ".publish_manifest.json")
+
+
+@dataclass(frozen=True)
+class FTPSettings:
+    host: str = setting("FTP_HOST", required=True)
+    user: str = setting("FTP_USER", required=True)
+    password: str = setting("FTP_PASS", required=True)
+    remote_dir: str = setting("FTP_REMOTE_DIR", ".")
+    port: int = setting("FTP_PORT", "21")
+    use_tls: bool = setting("FTP_USE_TLS", "0")  # explicit FTPS (AUTH TLS) with encrypted transfers
+    timeout: float = setting("FTP_TIMEOUT", "60")
+    max_concurrency: int = setting("FTP_MAX_CONCURRENCY", "4")
+
+
+@dataclass(frozen=True)
+class HTTPSettings:
+    """HTTP client (http_client.py): pooled keep-alive sessions per host."""
+    connect_timeout: float = setting("HTTP_CONNECT_TIMEOUT", "10")
+    read_timeout: float = setting("HTTP_READ_TIMEOUT", "60")
+    pool_size: int = setting("HTTP_POOL_SIZE", "10")
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    """Batch concurrency (run_all_aggregators.py runs every category in one process)."""
+    workers: int = setting("AGGREGATOR_WORKERS", "6")
+
+
+# Section name -> settings class
+SECTIONS = {
+    'arxiv': ArxivSettings,
+    'cache': CacheSettings,
+    'llm_cache': LLMCacheSettings,
+    'state': StateSettings,
+    'ollama': OllamaSettings,
+    'unsplash': UnsplashSettings,
+    'images': ImageSettings,
+    'archive': ArchiveSettings,
+    'search': SearchSettings,
+    'compress': CompressSettings,
+    'publish': PublishSettings,
+    'ftp': FTPSettings,
+    'http': HTTPSettings,
+    'batch': BatchSettings,
+}
+
+
+class Settings:
+    """All configuration, parsed and validated one section at a time on first access.
+
+    Sections are attributes (``settings.ftp.host``); reading a section whose
+    required variables are missing raises ValueError.
+    """
+
+    def __init__(self, values):
+        self._values = dict(values)
+        self._sections = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build settings from the environment, after loading the .env file."""
+        from dotenv import load_dotenv
+        load_dotenv()
+        return cls(os.environ)
+
+    @classmethod
+    def from_dict(cls, values):
+        """Build settings from a dict of variable names to strings (for tests and benchmarks)."""
+        return cls(values)
+
+    def section(self, name):
+        """Return a parsed section, validating its required variables."""
+        cached = self._sections.get(name)
+        if cached is not None:
+            return cached
+
+        section_class = SECTIONS[name]
+        parsed, missing = {}, []
+        for f in fields(section_class):
+            meta = f.metadata
+            raw = self._values.get(meta['env']) or None
+            if raw is None:
+                if meta['required']:
+                    missing.append(meta['env'])
+                    continue
+                raw = meta['default'](self._values) if callable(meta['default']) else meta['default']
+            parsed[f.name] = _parse(raw, f.type, meta['item']) if raw is not None else None
+        if missing:
+            raise ValueError(f"Missing required environment variables: {', '.join(missing)}. "
+                             f"Please check your .env file and ensure all required variables are set.")
+
+        self._sections[name] = section_class(**parsed)
+        return self._sections[name]
+
+    def is_configured(self, name):
+        """Return True if a section's required variables are all set."""
+        try:
+            self.section(name)
+            return True
+        except ValueError:
+            return False
+
+    def __getattr__(self, name):
+        if name in SECTIONS:
+            return self.section(name)
+        raise AttributeError(name)
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """Return the active settings, loading them from .env and the environment on first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings.from_env()
+        return _settings
+
 
-missing_vars = [var for var in required_env_vars if not os.getenv(var)]
-if missing_vars:
-    raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}. "
-                     f"Please check your .env file and ensure all required variables are set.")
+def configure(settings):
+    """Install settings (a Settings object or a dict of variable names) for this process."""
+    global _settings
+    with _settings_lock:
+        _settings = settings if isinstance(settings, Settings) else Settings.from_dict(settings)
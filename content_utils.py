@@ -3,103 +3,104 @@ Shared utilities for content generation across all aggregators.
 Implements DRY methodology to eliminate code redundancy.
 """
 
-import re
-from config import OLLAMA_MODEL, OLLAMA_API_URL
+from config import get_settings
 import requests
+from concurrency import limit
+import llm_cache
+import http_client
+import text_cleaner
 import json
 from datetime import datetime
 
+# Bump whenever a prompt below changes so stored rewrites are regenerated
+PROMPT_VERSION = 2
+
+# Stop sequences per task: generation ends as soon as the model starts the
+# kind of trailing commentary clean_generated_text would strip anyway
+HEADLINE_STOP = ["\nThis headline", "\nI removed", "\nI also", "\nNote:", "(I "]
+KEYWORD_STOP = [",", ".", "\n\n"]
+
 def log(message):
     """Shared logging utility."""
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
 
-def call_ollama(prompt, max_tokens=200, temperature=0.2):
-    """Shared Ollama API call function."""
+def call_ollama(prompt, max_tokens=200, temperature=0.2, refresh=None, format=None,
+                stop=None, stream=None):
+    """Shared Ollama API call function.
+
+    Generation limits go in Ollama's ``options`` (``num_predict``,
+    ``temperature`` and optional ``stop`` sequences) so they are actually
+    applied. By default the response is requested in non-streaming mode and
+    decoded once; stream=True (or OLLAMA_STREAM=1) reads line-delimited chunks.
+
+    Responses are served from llm_cache when an identical request was made
+    before; pass refresh=True (or set LLM_CACHE_REFRESH=1) to regenerate.
+    Pass format='json' to constrain the output to a JSON value.
+    """
+    settings = get_settings()
+    if refresh is None:
+        refresh = settings.llm_cache.refresh
+    if stream is None:
+        stream = settings.ollama.stream
+    cache_enabled = settings.llm_cache.enabled
+
+    options = {
+        'num_predict': max_tokens,
+        'temperature': temperature,
+    }
+    if stop:
+        options['stop'] = list(stop)
     payload = {
-        'model': OLLAMA_MODEL,
+        'model': settings.ollama.model,
         'prompt': prompt,
-        'max_tokens': max_tokens,
-        'temperature': temperature,
+        'options': options,
     }
+    if format:
+        payload['format'] = format
+    key = llm_cache.cache_key(**payload)
+    if cache_enabled and not refresh:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    payload['stream'] = stream
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload, stream=True)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        with limit('ollama'):
+            response = http_client.post(settings.ollama.api_url, json=payload, stream=stream,
+                                        timeout=(settings.http.connect_timeout, settings.ollama.read_timeout))
+            response.raise_for_status()
+
+            if stream:
+                chunks = []
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if 'response' in chunk:
+                        chunks.append(chunk['response'])
+                    if chunk.get('done'):
+                        break
+                full_text = ''.join(chunks)
+            else:
+                full_text = response.json().get('response', '')
+    except (requests.RequestException, ValueError) as e:
         log(f"Error calling Ollama: {e}")
         return None
 
-    full_text = ""
-    for line in response.iter_lines(decode_unicode=True):
-        if not line:
-            continue
-        try:
-            chunk = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if 'response' in chunk:
-            full_text += chunk['response']
-        if chunk.get('done'):
-            break
-
-    return full_text.strip()
-
-def clean_generated_text(text):
-    """Clean up LLM-generated text to remove narrative elements."""
-    if not text:
-        return "[Generation failed]"
-    
-    cleaned = text.strip()
-    
-    # Remove common narrative prefixes and explanations
-    narrative_patterns = [
-        r'^Here.*?:',
-        r'^Two sentences.*?:',
-        r'^Explanation.*?:',
-        r'^Story.*?:',
-        r'^Headline.*?:',
-        r'^\*\*.*?\*\*',  # Remove **Style 1:** etc.
-        r'^Style \d+.*?:',
-        r'^Option \d+.*?:',
-        r'^Possible.*?:',
-        r'^This headline.*',
-        r'^I removed.*',
-        r'^I also.*',
-        r'^The word.*',
-        r'^\d+\.\s*\*\*.*?\*\*',  # Remove numbered options
-        r'^\d+\.\s*".*?"',  # Remove numbered quotes
-        r'^\d+\.\s+',  # Remove numbered lists
-        r'\(I.*?\)',  # Remove parenthetical explanations
-        r'This headline.*',
-        r'The focus is.*',
-        r'rather than.*',
-    ]
-    
-    for pattern in narrative_patterns:
-        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
-    
-    # Remove quotes at the beginning and end
-    cleaned = cleaned.strip('"').strip("'").strip()
-    
-    # Remove multiple newlines and clean up
-    cleaned = re.sub(r'\n\s*\n', ' ', cleaned)
-    cleaned = re.sub(r'\s+', ' ', cleaned)
-    
-    # For headlines, take only the first sentence/phrase before explanatory text
-    if any(phrase in cleaned.lower() for phrase in ['this headline', 'the word', 'i removed', 'the focus']):
-        # Split on common explanation starters and take the first part
-        for split_phrase in [' This headline', ' The word', ' I removed', ' The focus', ' (I']:
-            if split_phrase in cleaned:
-                cleaned = cleaned.split(split_phrase)[0].strip()
-                break
-    
-    # For summaries, take only the first two sentences
-    sentences = re.split(r'[.!?]+', cleaned)
-    if len(sentences) >= 2:
-        cleaned = '. '.join(sentences[:2]).strip() + '.'
-    elif len(sentences) == 1 and sentences[0].strip():
-        cleaned = sentences[0].strip() + '.'
-    
-    return cleaned.strip()
+    full_text = full_text.strip()
+    if cache_enabled and full_text:
+        llm_cache.put(key, full_text)
+    return full_text
+
+def clean_generated_text(text, task='headline'):
+    """Clean up LLM-generated text to remove narrative elements.
+
+    task selects the rule set in text_cleaner: 'headline', 'blurb' or 'keyword'.
+    """
+    return text_cleaner.clean(text, task)
 
 def rewrite_title(original_title, category="research", original_synopsis=None, rewritten_summary=None):
     """Generate an engaging headline from an academic title, considering synopsis and rewritten summary."""
@@ -125,8 +126,8 @@ def rewrite_title(original_title, category="research", original_synopsis=None, r
     """
 
     # Call Ollama API to generate the headline
-    text = call_ollama(prompt, max_tokens=1024, temperature=0.2)
-    cleaned = clean_generated_text(text)
+    text = call_ollama(prompt, max_tokens=1024, temperature=0.2, stop=HEADLINE_STOP)
+    cleaned = clean_generated_text(text, 'headline')
     
     # Take only the first line if multiple lines
     lines = cleaned.split('\n')
@@ -151,7 +152,7 @@ Abstract: "{summary}"
 """
 
     text = call_ollama(prompt, max_tokens=4096, temperature=0.2)
-    cleaned = clean_generated_text(text)
+    cleaned = clean_generated_text(text, 'blurb')
     
     return cleaned if cleaned and cleaned != "[Generation failed]" else "[Summary generation failed]"
 
@@ -159,14 +160,59 @@ def generate_search_keywords(title, summary, category="technology"):
     """Generate search keywords for Unsplash based on article content."""
     prompt = f"{title}\n\nOne visual keyword for photos:"
     
-    text = call_ollama(prompt, max_tokens=5, temperature=0.2)
+    text = call_ollama(prompt, max_tokens=5, temperature=0.2, stop=KEYWORD_STOP)
     if text:
         # Clean up the response aggressively
-        cleaned = clean_generated_text(text)
+        cleaned = clean_generated_text(text, 'keyword')
         # Take only the first word/phrase
         keywords = [k.strip().strip('"').strip("'") for k in cleaned.split(',')]
         keyword = keywords[0] if keywords else category
         # Remove any remaining explanatory text
         keyword = keyword.split('\n')[0].split('.')[0].strip()
         return keyword if keyword else category
-    return category
\ No newline at end of file
+    return category
+
+def rewrite_combined(title, summary, category="research"):
+    """Generate headline, blurb and image keyword with a single JSON-mode Ollama call.
+
+    Returns a dict with 'title', 'blurb' and 'keyword', or None if the
+    response is missing or invalid so callers can fall back to
+    rewrite_blurb/rewrite_title/generate_search_keywords.
+    """
+    prompt = f"""Rewrite the following academic paper for a general readership interested in AI breakthroughs.
+Respond with a JSON object with exactly these keys:
+- "blurb": two plain-language sentences. Sentence 1 explains what the researchers did, using simple terms instead of technical phrases. Sentence 2 describes why it matters (impact, potential, or benefit), again without jargon. Do not begin with "Researchers" or any variant, and do not use directive openers like "Imagine..." or "In this paper...".
+- "headline": a concise, engaging headline under 60 characters in title case, in plain language, with no clickbait, quotes or trailing period, consistent with the blurb.
+- "keyword": one visual keyword for finding a stock photo.
+
+Title: "{title}"
+Abstract: "{summary}"
+"""
+
+    text = call_ollama(prompt, max_tokens=1024, temperature=0.2, format='json')
+    if not text:
+        return None
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        log("Combined rewrite returned invalid JSON; falling back to separate calls")
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    fields = {}
+    for key in ('headline', 'blurb', 'keyword'):
+        value = data.get(key)
+        if not isinstance(value, str) or not value.strip():
+            log(f"Combined rewrite missing '{key}'; falling back to separate calls")
+            return None
+        fields[key] = value.strip()
+
+    blurb = clean_generated_text(fields['blurb'], 'blurb')
+    headline = clean_generated_text(fields['headline'], 'headline').split('\n')[0].strip().strip('"').strip("'")
+    keyword = fields['keyword'].split(',')[0].split('\n')[0].strip().strip('"').strip("'").rstrip('.')
+    if blurb == "[Generation failed]" or not headline or len(headline) > 120 or not keyword:
+        log("Combined rewrite failed validation; falling back to separate calls")
+        return None
+
+    return {'title': headline, 'blurb': blurb, 'keyword': keyword}
@@ -4,35 +4,26 @@ Utility module for tracking featured articles across different aggregators
 to prevent the same story from being featured on multiple pages.
 """
 
-import os
-import json
 from typing import Set, List, Dict, Any
 
-FEATURED_IDS_FILE = 'featured_arxiv_ids.json'
+import state_store
 
 def load_featured_ids() -> Set[str]:
     """Load the set of already-featured article IDs."""
-    try:
-        with open(FEATURED_IDS_FILE, 'r', encoding='utf-8') as f:
-            return set(json.load(f))
-    except FileNotFoundError:
-        return set()
+    return state_store.featured_ids()
 
 def save_featured_ids(featured_ids: Set[str]) -> None:
     """Save the set of featured article IDs."""
-    with open(FEATURED_IDS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(list(featured_ids), f, indent=2)
+    for article_id in featured_ids:
+        state_store.claim_featured(article_id)
 
-def add_featured_id(article_id: str) -> None:
-    """Add a single article ID to the featured list."""
-    featured_ids = load_featured_ids()
-    featured_ids.add(article_id)
-    save_featured_ids(featured_ids)
+def add_featured_id(article_id: str) -> bool:
+    """Add a single article ID to the featured list; returns False if it was already there."""
+    return state_store.claim_featured(article_id)
 
 def clear_featured_ids() -> None:
     """Clear all featured article IDs (useful for starting a fresh batch)."""
-    if os.path.exists(FEATURED_IDS_FILE):
-        os.remove(FEATURED_IDS_FILE)
+    state_store.clear_featured()
 
 def select_featured_article(articles: List[Dict[str, Any]]) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
     """
@@ -48,15 +39,10 @@ def select_featured_article(articles: List[Dict[str, Any]]) -> tuple[Dict[str, A
     if not articles:
         return None, articles
     
-    featured_ids = load_featured_ids()
-    
-    # Find the first article that hasn't been featured yet
+    # Claim the first article that hasn't been featured yet; the claim is atomic,
+    # so concurrently running categories (or processes) can't feature the same one
     for i, article in enumerate(articles):
-        article_id = article['id']
-        if article_id not in featured_ids:
-            # Mark this article as featured
-            add_featured_id(article_id)
-            
+        if add_featured_id(article['id']):
             # Return the featured article and the remaining articles
             remaining = articles[:i] + articles[i+1:]
             return article, remaining
@@ -0,0 +1,90 @@
+"""
+On-disk HTTP cache for the arXiv fetch stage.
+
+Raw Atom responses are stored under CACHE_DIR/feeds together with their
+ETag/Last-Modified validators, and requests are sent as conditional GETs:
+a 304 Not Modified answer is served from the stored body, which always
+matches the validators stored with it.
+
+The cache only saves bandwidth. Whether a category's page needs
+rebuilding is decided from the entries themselves (see
+arxiv_fetch.articles_fingerprint), against a fingerprint recorded only
+after the page was written, so a run that fails after fetching never
+makes the next run skip the category.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+import feedparser
+import requests
+
+from config import get_settings
+from content_utils import log
+import http_client
+
+
+def _cache_paths(url):
+    """Return the (body, metadata) cache file paths for a URL."""
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    feed_dir = get_settings().cache.feed_dir
+    return (os.path.join(feed_dir, f"{key}.xml"),
+            os.path.join(feed_dir, f"{key}.json"))
+
+
+def load_cached(url):
+    """Return (body, metadata) for a cached URL, or (None, {}) if not cached."""
+    body_path, meta_path = _cache_paths(url)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            return f.read(), meta
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, {}
+
+
+def store(url, body, meta):
+    """Write a response body and its metadata to the cache."""
+    body_path, meta_path = _cache_paths(url)
+    os.makedirs(os.path.dirname(body_path), exist_ok=True)
+    with open(body_path, 'wb') as f:
+        f.write(body)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def fetch_feed(url):
+    """Fetch and parse an Atom feed through the cache; return the feedparser result."""
+    cached_body, meta = load_cached(url)
+
+    headers = {}
+    if cached_body is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        response = http_client.get(url, headers=headers)
+        if response.status_code == 304 and cached_body is not None:
+            log("arXiv feed not modified (304), using cached copy")
+            return feedparser.parse(cached_body)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if cached_body is None:
+            log(f"Error fetching arXiv feed: {e}")
+            return feedparser.parse(b'')
+        log(f"Error fetching arXiv feed, using cached copy: {e}")
+        return feedparser.parse(cached_body)
+
+    body = response.content
+    store(url, body, {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': datetime.now().isoformat(timespec='seconds'),
+    })
+    return feedparser.parse(body)
@@ -0,0 +1,81 @@
+"""
+Shared FTP connection pool.
+
+Logged-in sessions (plain FTP, or FTPS with an encrypted data channel when
+FTP_USE_TLS is set) are kept for the whole batch and handed out to upload
+workers, so publishing logs in and changes directory once per connection
+instead of once per aggregator. At most FTP_MAX_CONCURRENCY sessions are
+open at a time (the shared 'ftp' limit from concurrency.py).
+"""
+
+import ftplib
+import threading
+from contextlib import contextmanager
+
+from config import get_settings
+from concurrency import limit
+
+_idle = []
+_idle_lock = threading.Lock()
+
+
+def _open():
+    """Open, log in and cd into FTP_REMOTE_DIR on a new session."""
+    settings = get_settings().ftp
+    ftp = ftplib.FTP_TLS(timeout=settings.timeout) if settings.use_tls else ftplib.FTP(timeout=settings.timeout)
+    ftp.encoding = 'utf-8'
+    ftp.connect(settings.host, settings.port)
+    ftp.login(settings.user, settings.password)
+    if settings.use_tls:
+        # Encrypt file transfers too, not just the login
+        ftp.prot_p()
+    ftp.cwd(settings.remote_dir)
+    return ftp
+
+
+def _close(ftp):
+    try:
+        ftp.quit()
+    except (ftplib.Error, OSError, EOFError):
+        ftp.close()
+
+
+def _take_idle():
+    """Return a live idle session, or None if there is none."""
+    while True:
+        with _idle_lock:
+            if not _idle:
+                return None
+            ftp = _idle.pop()
+        try:
+            ftp.voidcmd('NOOP')
+            return ftp
+        except (ftplib.Error, OSError, EOFError):
+            # The server dropped the session while it sat idle
+            ftp.close()
+
+
+@contextmanager
+def connection():
+    """Borrow a logged-in session whose working directory is FTP_REMOTE_DIR.
+
+    A session that raised is discarded instead of being returned to the pool.
+    """
+    with limit('ftp'):
+        ftp = _take_idle() or _open()
+        try:
+            yield ftp
+        except BaseException:
+            _close(ftp)
+            raise
+        with _idle_lock:
+            _idle.append(ftp)
+
+
+def close_connections():
+    """Log out of every pooled session (end of a batch)."""
+    with _idle_lock:
+        sessions = list(_idle)
+        _idle.clear()
+    for ftp in sessions:
+        _close(ftp)
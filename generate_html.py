@@ -1,32 +1,79 @@
 import os
+import re
+import threading
 from datetime import datetime
 
-# Path to base template (HTML boilerplate with CSS placeholders)
-TEMPLATE_PATH = os.path.join('templates', 'base_template.html')
-ML_TEMPLATE_PATH = os.path.join('templates', 'ml_template.html')
-CV_TEMPLATE_PATH = os.path.join('templates', 'cv_template.html')
-CR_TEMPLATE_PATH = os.path.join('templates', 'cr_template.html')
-RO_TEMPLATE_PATH = os.path.join('templates', 'ro_template.html')
-HC_TEMPLATE_PATH = os.path.join('templates', 'hc_template.html')
+from categories import DEFAULT_TEMPLATE, get_category
+
+# Directory holding the per-category HTML templates
+TEMPLATES_DIR = 'templates'
+
+# Template marker -> slot name filled in by render_template
+TEMPLATE_SLOTS = {
+    '<!--ARTICLES_PLACEHOLDER-->': 'articles',
+    '<!--SIDEBAR_ARTICLES_PLACEHOLDER-->': 'sidebar',
+    '{date}': 'date',
+}
+_SLOT_PATTERN = re.compile('(' + '|'.join(re.escape(marker) for marker in TEMPLATE_SLOTS) + ')')
+
+# Template file name -> compiled template, filled on first use
+_compiled_templates = {}
+_templates_lock = threading.Lock()
+
+
+def compile_template(text):
+    """Split template text into static chunks and the slots between them.
+
+    Returns (chunks, slots) with len(chunks) == len(slots) + 1: the page is
+    chunks[0] + value of slots[0] + chunks[1] + ... + chunks[-1].
+    """
+    parts = _SLOT_PATTERN.split(text)
+    return tuple(parts[0::2]), tuple(TEMPLATE_SLOTS[marker] for marker in parts[1::2])
 
 
 def load_template(category="AI Research"):
-    """Read the appropriate HTML template into a string based on category."""
-    if category == "Machine Learning":
-        template_path = ML_TEMPLATE_PATH
-    elif category == "Computer Vision":
-        template_path = CV_TEMPLATE_PATH
-    elif category == "Security/Cryptography":
-        template_path = CR_TEMPLATE_PATH
-    elif category == "Robotics":
-        template_path = RO_TEMPLATE_PATH
-    elif category == "Human-Computer Interaction":
-        template_path = HC_TEMPLATE_PATH
-    else:
-        template_path = TEMPLATE_PATH
-    
-    with open(template_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    """Return the compiled HTML template for a category, reading the file only once per process."""
+    try:
+        template_name = get_category(category).get('template', DEFAULT_TEMPLATE)
+    except KeyError:
+        template_name = DEFAULT_TEMPLATE
+
+    compiled = _compiled_templates.get(template_name)
+    if compiled is None:
+        with _templates_lock:
+            compiled = _compiled_templates.get(template_name)
+            if compiled is None:
+                with open(os.path.join(TEMPLATES_DIR, template_name), 'r', encoding='utf-8') as f:
+                    compiled = _compiled_templates[template_name] = compile_template(f.read())
+    return compiled
+
+
+def clear_template_cache():
+    """Forget compiled templates, so edited template files are read again."""
+    with _templates_lock:
+        _compiled_templates.clear()
+
+
+def iter_template(compiled, values):
+    """Yield a compiled template's chunks with its slots filled from values.
+
+    Each value is a string or an iterable of string fragments (such as a
+    generator, which is consumed where its slot first appears).
+    """
+    chunks, slots = compiled
+    yield chunks[0]
+    for slot, chunk in zip(slots, chunks[1:]):
+        value = values[slot]
+        if isinstance(value, str):
+            yield value
+        else:
+            yield from value
+        yield chunk
+
+
+def render_template(compiled, values):
+    """Fill a compiled template's slots and return the page as one string."""
+    return ''.join(iter_template(compiled, values))
 
 
 def clean_headline(title):
@@ -37,21 +84,29 @@ def convert_to_pdf_url(url):
     """Convert arXiv abstract URL to PDF URL by replacing /abs/ with /pdf/"""
     return url.replace('/abs/', '/pdf/')
 
-def generate_html(articles, category="AI Research"):
-    """Generate a complete HTML page given a list of article dicts.
+def picture_html(img, css_class):
+    """Return the markup for an article image.
 
-    Each article dict should have:
-      - id: unique arXiv ID (string)
-      - title: rewritten headline
-      - blurb: rewritten summary
-      - url: link to the arXiv abstract
-      - featured: optional bool
-    
-    Args:
-      - category: The category name to display (e.g., "AI Research", "Machine Learning")
+    Images with per-format srcsets (see image_stage) become a <picture> with
+    AVIF/WebP sources and a JPEG fallback; images stored by older runs keep
+    a plain <img>.
     """
-    template = load_template(category)
+    srcset = img.get('srcset')
+    if not srcset:
+        return f'<img src="{img["path"]}" alt="{img["alt_text"]}" class="{css_class}" />'
+
+    sources = "".join(
+        f'\n            <source type="{mime}" srcset="{candidates}" />'
+        for mime, candidates in srcset.items() if mime != 'image/jpeg'
+    )
+    jpeg_srcset = srcset.get('image/jpeg', img['path'])
+    return (f'<picture>{sources}\n'
+            f'            <img src="{img["path"]}" srcset="{jpeg_srcset}" alt="{img["alt_text"]}" class="{css_class}" />\n'
+            f'          </picture>')
 
+
+def split_articles(articles):
+    """Return (featured article, main grid articles, sidebar articles) for a page."""
     # Separate featured article (only one) and others
     featured = None
     others = []
@@ -73,10 +128,11 @@ def generate_html(articles, category="AI Research"):
     else:
         main_articles = []
         sidebar_articles = others  # All remaining articles go to sidebar
+    return featured, main_articles, sidebar_articles
 
-    # Build HTML segments for main content
-    html_segments = ""
-    
+
+def iter_main_html(featured, main_articles, category):
+    """Yield the main content fragments: the featured article, then the articles grid."""
     # Featured article section
     if featured:
         image_html = ""
@@ -91,11 +147,11 @@ def generate_html(articles, category="AI Research"):
                 </div>'''
             image_html = f"""
         <div class="featured-image">
-          <img src="{img['path']}" alt="{img['alt_text']}" class="article-img" />
+          {picture_html(img, 'article-img')}
           {credit_html}
         </div>"""
         
-        html_segments += f"""
+        yield f"""
       <article class="featured-article">
         <div class="category-tag">FEATURED {category.upper()}</div>
         <h1>{clean_headline(featured['title'])}</h1>
@@ -107,7 +163,7 @@ def generate_html(articles, category="AI Research"):
 
     # Regular articles grid (main content)
     if main_articles:
-        html_segments += '\n      <div class="articles-grid">\n'
+        yield '\n      <div class="articles-grid">\n'
         for art in main_articles:
             image_html = ""
             if art.get('image'):
@@ -121,35 +177,92 @@ def generate_html(articles, category="AI Research"):
                     </div>'''
                 image_html = f"""
           <div class="article-thumbnail">
-            <img src="{img['path']}" alt="{img['alt_text']}" class="thumbnail-img" />
+            {picture_html(img, 'thumbnail-img')}
             {credit_html}
           </div>"""
             
-            html_segments += f"""        <article class="article">
+            yield f"""        <article class="article">
           {image_html}
           <h2>{clean_headline(art['title'])}</h2>
           <p class="summary">{art['blurb']}</p>
           <a href="{convert_to_pdf_url(art['url'])}" target="_blank" class="read-more">Read Paper →</a>
         </article>
 """
-        html_segments += '      </div>\n'
+        yield '      </div>\n'
+
 
-    # Build sidebar articles HTML
-    sidebar_html = ""
-    if sidebar_articles:
-        for art in sidebar_articles:
-            sidebar_html += f"""        <article class="sidebar-article">
+def iter_sidebar_html(sidebar_articles, archive_url=None):
+    """Yield one fragment per sidebar article, then the archive link if there is one."""
+    for art in sidebar_articles:
+        yield f"""        <article class="sidebar-article">
           <h3><a href="{convert_to_pdf_url(art['url'])}" target="_blank">{clean_headline(art['title'])}</a></h3>
           <p class="summary">{art['blurb']}</p>
           <a href="{convert_to_pdf_url(art['url'])}" target="_blank" class="read-more">Read Paper →</a>
         </article>
 """
+    if archive_url:
+        yield f"""        <a href="{archive_url}" class="read-more">Browse the archive →</a>
+"""
+
+
+def iter_html(articles, category="AI Research", archive_url=None):
+    """Yield a complete HTML page as a sequence of string chunks.
+
+    Article markup is produced as the page is consumed, so a page can be
+    streamed to a file, a gzip writer or a socket (see write_html) without
+    ever holding the whole document in memory.
+
+    Each article dict should have:
+      - id: unique arXiv ID (string)
+      - title: rewritten headline
+      - blurb: rewritten summary
+      - url: link to the arXiv abstract
+      - featured: optional bool
+      - image: optional image dict from image_stage (path, srcset, alt_text, credit)
+    
+    Args:
+      - category: The category name to display (e.g., "AI Research", "Machine Learning")
+      - archive_url: optional link to the category's archive, shown below the sidebar
+    """
+    featured, main_articles, sidebar_articles = split_articles(articles)
+    return iter_template(load_template(category), {
+        'articles': iter_main_html(featured, main_articles, category),
+        'sidebar': iter_sidebar_html(sidebar_articles, archive_url),
+        'date': datetime.now().strftime("%B %d, %Y"),
+    })
+
+
+def generate_html(articles, category="AI Research", archive_url=None):
+    """Generate a complete HTML page as one string (see iter_html for the article fields)."""
+    return ''.join(iter_html(articles, category, archive_url))
+
+
+def write_chunks(chunks, out):
+    """Write string chunks to a text file object (anything with write(str)); return characters written."""
+    written = 0
+    for chunk in chunks:
+        written += out.write(chunk) or len(chunk)
+    return written
+
+
+def write_chunks_file(chunks, path):
+    """Stream string chunks to path through a temporary file renamed into place; return characters written.
+
+    Readers (and the publisher) never see a half-written page.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        written = write_chunks(chunks, f)
+    os.replace(tmp_path, path)
+    return written
+
+
+def write_html(articles, out, category="AI Research", archive_url=None):
+    """Stream a page to a text file object (a file, gzip writer, socket makefile); return characters written."""
+    return write_chunks(iter_html(articles, category, archive_url), out)
 
-    # Replace placeholders
-    html = template.replace("<!--ARTICLES_PLACEHOLDER-->", html_segments)
-    html = html.replace("<!--SIDEBAR_ARTICLES_PLACEHOLDER-->", sidebar_html)
 
-    # Insert current date
-    today = datetime.now().strftime("%B %d, %Y")
-    html = html.replace('{date}', today)
-    return html
+def write_html_file(articles, path, category="AI Research", archive_url=None):
+    """Stream a page to path, replacing it atomically; return characters written."""
+    return write_chunks_file(iter_html(articles, category, archive_url), path)
@@ -0,0 +1,56 @@
+"""
+Shared HTTP client layer.
+
+One pooled keep-alive requests.Session per host (Ollama, Unsplash API,
+Unsplash image CDN, arXiv), so repeated calls reuse TCP/TLS connections,
+and default connect/read timeouts so a hung request can't stall a batch.
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import get_settings
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    """Return the pooled session for the host of a URL, creating it on first use."""
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=get_settings().http.pool_size)
+            session.mount(f"{parts.scheme}://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def default_timeout():
+    """Return the (connect, read) timeout applied when a call doesn't pass one."""
+    settings = get_settings().http
+    return (settings.connect_timeout, settings.read_timeout)
+
+
+def get(url, timeout=None, **kwargs):
+    """GET through the pooled session for the URL's host."""
+    return get_session(url).get(url, timeout=timeout or default_timeout(), **kwargs)
+
+
+def post(url, timeout=None, **kwargs):
+    """POST through the pooled session for the URL's host."""
+    return get_session(url).post(url, timeout=timeout or default_timeout(), **kwargs)
+
+
+def close_sessions():
+    """Close every pooled session (end of a batch)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,348 @@
+"""
+Concurrent Unsplash image stage.
+
+Every image a category page needs is fetched in one stage instead of
+inside the per-article loop: keyword generation, search and download run
+on a thread pool (still bounded by the shared 'unsplash' and 'ollama'
+limits), and the CPU-bound resize runs on a process pool. Photos are
+decoded straight from the downloaded bytes, and JPEGs are downscaled by
+the decoder with ``Image.draft`` before the LANCZOS resample, so large
+originals are never fully decoded. Download and resize times are logged
+per image.
+
+Each photo is written in every size of IMAGE_DENSITIES (1x, 2x) and in
+the modern formats of IMAGE_FORMATS this Pillow build can encode (AVIF,
+WebP) next to the JPEG fallback, all from one decode, and the page gets a
+srcset per format for generate_html's ``<picture>`` markup.
+"""
+
+import io
+import os
+import time
+import shutil
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import requests
+from PIL import Image
+
+from config import UNSPLASH_API_URL, get_settings
+from content_utils import log, generate_search_keywords
+from concurrency import limit
+import unsplash_cache
+import http_client
+
+# 1x bounding box and encoder quality per image size
+IMAGE_SIZES = {
+    'thumbnail': ((120, 80), 85),
+    'featured': ((300, 200), 90),
+}
+
+# file extension -> (Pillow format, MIME type)
+IMAGE_TYPES = {
+    'avif': ('AVIF', 'image/avif'),
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+
+# Every extension the image stage can produce (for clearing output/images)
+IMAGE_EXTENSIONS = tuple(f'.{ext}' for ext in IMAGE_TYPES)
+
+_process_pool = None
+_pool_lock = threading.Lock()
+
+
+def search_unsplash_photo(query, is_featured=False):
+    """Search for a photo on Unsplash and return photo data.
+
+    Results are cached per keyword (see unsplash_cache), so repeated keywords
+    don't spend another API request.
+    """
+    cached = unsplash_cache.get_search(query, is_featured)
+    if cached:
+        log(f"Using cached Unsplash search for: {query}")
+        return cached
+
+    headers = {
+        'Authorization': f'Client-ID {get_settings().unsplash.access_key}'
+    }
+
+    # Search for photos
+    search_url = f"{UNSPLASH_API_URL}/search/photos"
+    params = {
+        'query': query,
+        'per_page': 1,
+        'orientation': 'landscape' if is_featured else 'squarish'
+    }
+
+    try:
+        with limit('unsplash'):
+            response = http_client.get(search_url, headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
+
+        if data['results']:
+            photo = data['results'][0]
+
+            # Add UTM parameters to user profile link as required by Unsplash guidelines
+            user_link_with_utm = f"{photo['user']['links']['html']}?utm_source=arxiv_aggregator&utm_medium=referral"
+
+            photo_data = {
+                'id': photo['id'],
+                'url': photo['urls']['small'] if not is_featured else photo['urls']['regular'],
+                'download_url': photo['links']['download_location'],
+                'alt_description': photo.get('alt_description', ''),
+                'user': photo['user']['name'],
+                'user_link': user_link_with_utm,
+                'unsplash_link': f"https://unsplash.com/?utm_source=arxiv_aggregator&utm_medium=referral"
+            }
+            unsplash_cache.put_search(query, photo_data, is_featured)
+            return photo_data
+    except requests.RequestException as e:
+        log(f"Error searching Unsplash: {e}")
+
+    return None
+
+
+def variant_suffix(density, ext):
+    """Return the file name suffix of a variant, e.g. '.webp' or '@2x.webp'."""
+    return f".{ext}" if density == 1 else f"@{density}x.{ext}"
+
+
+def variant_extensions():
+    """Return the extensions written for every image, preferred first.
+
+    JPEG is always written as the fallback; IMAGE_FORMATS entries this
+    Pillow build can't encode are skipped.
+    """
+    return _encodable_extensions(tuple(get_settings().images.formats))
+
+
+@functools.lru_cache(maxsize=None)
+def _encodable_extensions(formats):
+    """Resolve IMAGE_FORMATS against the encoders Pillow has registered, once per setting.
+
+    Looking the format up in Image.SAVE (instead of features.check) works on
+    every Pillow version: older builds that know nothing of AVIF just lack
+    the encoder rather than warning about an unknown feature.
+    """
+    Image.init()
+    return [ext for ext in formats
+            if ext in IMAGE_TYPES and ext != 'jpg' and IMAGE_TYPES[ext][0] in Image.SAVE] + ['jpg']
+
+
+def output_name(photo_id, is_featured, suffix=''):
+    """Return the output/images file name of a photo variant, e.g. 'featured_Dwu85P9SOIk@2x.webp'.
+
+    Names carry the size, so an article that is featured on one page and a
+    thumbnail on another (or moves between the two) never overwrites the
+    other size's files, and the photo ID, so a file always matches its credit.
+    """
+    return f"{'featured' if is_featured else 'thumbnail'}_{photo_id}{suffix}"
+
+
+def image_files(image_data):
+    """Return every output-relative file a page image dict references (src and srcset)."""
+    files = [image_data['path']]
+    for srcset in image_data.get('srcset', {}).values():
+        files.extend(candidate.split()[0] for candidate in srcset.split(', '))
+    return files
+
+
+def is_reusable(image_data, is_featured):
+    """Return True if a stored page image dict is of this size and all of its files are still in output/."""
+    return (image_data['filename'].startswith(output_name('', is_featured)) and
+            all(os.path.exists(os.path.join('output', f)) for f in image_files(image_data)))
+
+
+def variant_suffixes():
+    """Return the suffixes of every variant written per image."""
+    return [variant_suffix(d, ext) for d in get_settings().images.densities for ext in variant_extensions()]
+
+
+def resize_image(data, size, extensions, densities):
+    """Decode image bytes once and encode every density and format of a size.
+
+    Runs in a worker process, so it only takes and returns plain data (the
+    worker never reads settings): a dict mapping variant suffix (see
+    variant_suffix) to encoded bytes.
+    """
+    box, quality = IMAGE_SIZES[size]
+    densities = sorted(densities, reverse=True)
+    variants = {}
+    with Image.open(io.BytesIO(data)) as img:
+        # Let the JPEG decoder scale down by a power of two before resampling
+        img.draft('RGB', (box[0] * densities[0], box[1] * densities[0]))
+        source = img.convert('RGB') if img.mode not in ('RGB', 'L') else img
+        # Largest density first; each smaller one is resampled from the previous result
+        for density in densities:
+            scaled = source.copy()
+            scaled.thumbnail((box[0] * density, box[1] * density), Image.Resampling.LANCZOS)
+            for ext in extensions:
+                out = io.BytesIO()
+                scaled.save(out, IMAGE_TYPES[ext][0], quality=quality)
+                variants[variant_suffix(density, ext)] = out.getvalue()
+            source = scaled
+    return variants
+
+
+def _timed_resize(data, size, extensions, densities):
+    """Resize in a worker process and report how long the resize itself took."""
+    started = time.perf_counter()
+    variants = resize_image(data, size, extensions, densities)
+    return variants, time.perf_counter() - started
+
+
+def _get_process_pool():
+    """Return the shared resize pool, or None when resizing runs in-thread."""
+    global _process_pool
+    workers = get_settings().images.process_workers
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _process_pool is None:
+            # spawn rather than fork: the pool is created while other categories' threads are running
+            _process_pool = ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def shutdown():
+    """Stop the resize worker processes."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown()
+            _process_pool = None
+
+
+def _fetch(job):
+    """Pick a photo for one image job and download it unless it is already cached.
+
+    Returns (job, photo_data, downloaded bytes or None, download seconds); photo_data
+    is None when no photo could be found or downloaded.
+    """
+    if not job['keyword']:
+        job['keyword'] = generate_search_keywords(job['title'], job['summary'])
+    log(f"Searching Unsplash for: {job['keyword']}")
+
+    photo_data = search_unsplash_photo(job['keyword'], job['is_featured'])
+    if not photo_data:
+        log(f"No photo found for query: {job['keyword']}")
+        return job, None, None, 0.0
+
+    try:
+        # REQUIRED: Trigger download endpoint as per Unsplash API guidelines
+        # This is mandatory when using images in a way similar to downloading
+        headers = {'Authorization': f'Client-ID {get_settings().unsplash.access_key}'}
+        with limit('unsplash'):
+            download_response = http_client.get(photo_data['download_url'], headers=headers)
+        download_response.raise_for_status()
+        log(f"Triggered Unsplash download endpoint for photo {photo_data['id']}")
+
+        # Reuse the processed photo if an earlier article already downloaded it
+        if unsplash_cache.cached_image(photo_data['id'], job['is_featured'], variant_suffixes()):
+            return job, photo_data, None, 0.0
+
+        # Download the actual image using the hotlinked URL as required
+        started = time.perf_counter()
+        with limit('unsplash'):
+            response = http_client.get(photo_data['url'])
+        response.raise_for_status()
+        return job, photo_data, response.content, time.perf_counter() - started
+
+    except requests.RequestException as e:
+        log(f"Error downloading image: {e}")
+        return job, None, None, 0.0
+
+
+def _store(job, photo_data, variants):
+    """Write a photo's variants into the cache and output/images; return the page image dict.
+
+    variants is None when every variant is already cached.
+    """
+    if variants is not None:
+        for suffix, encoded in variants.items():
+            # Write under a temporary name, since categories running concurrently may fetch the same photo
+            cache_path = unsplash_cache.image_path(photo_data['id'], job['is_featured'], suffix)
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(encoded)
+            os.replace(tmp_path, cache_path)
+
+    os.makedirs('output/images', exist_ok=True)
+    for suffix in variant_suffixes():
+        shutil.copyfile(unsplash_cache.image_path(photo_data['id'], job['is_featured'], suffix),
+                        os.path.join('output', 'images', output_name(photo_data['id'], job['is_featured'], suffix)))
+    # The <img> fallback is the smallest JPEG written, which is only 1x when IMAGE_DENSITIES includes 1
+    densities = sorted(get_settings().images.densities)
+    filename = output_name(photo_data['id'], job['is_featured'], variant_suffix(densities[0], 'jpg'))
+
+    return {
+        'filename': filename,
+        'keyword': job['keyword'],
+        'path': f"images/{filename}",
+        'srcset': {
+            IMAGE_TYPES[ext][1]: ', '.join(f"images/{output_name(photo_data['id'], job['is_featured'], variant_suffix(d, ext))} {d}x"
+                                           for d in densities)
+            for ext in variant_extensions()
+        },
+        'alt_text': photo_data.get('alt_description', f"Photo related to: {job['title']}"),
+        'credit': f"Photo by {photo_data['user']} on Unsplash",
+        'credit_link': photo_data['user_link'],
+        'unsplash_link': photo_data['unsplash_link']
+    }
+
+
+def generate_images(jobs):
+    """Fetch and resize the images for a list of jobs concurrently.
+
+    Args:
+        jobs: dicts with 'title', 'summary', 'is_featured' and 'keyword'
+            (None to generate one from the title and summary)
+
+    Returns:
+        List of page image dicts (or None where no image could be produced),
+        in the same order as jobs. Each job's 'keyword' is filled in.
+    """
+    if not jobs:
+        return []
+
+    images = [None] * len(jobs)
+    settings = get_settings().images
+    variant_args = (variant_extensions(), settings.densities)
+    process_pool = _get_process_pool()
+    resizing = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, settings.download_workers)) as executor:
+        fetches = {executor.submit(_fetch, job): idx for idx, job in enumerate(jobs)}
+        for future in as_completed(fetches):
+            idx = fetches[future]
+            job, photo_data, data, download_seconds = future.result()
+            if photo_data is None:
+                continue
+            size = 'featured' if job['is_featured'] else 'thumbnail'
+            if data is None:
+                images[idx] = _store(job, photo_data, None)
+                log(f"Reused cached image for photo {photo_data['id']}: {images[idx]['filename']}")
+            elif process_pool is not None:
+                # Resize in a worker process while the remaining downloads continue
+                resizing[process_pool.submit(_timed_resize, data, size, *variant_args)] = (idx, photo_data, download_seconds)
+            else:
+                resizing[executor.submit(_timed_resize, data, size, *variant_args)] = (idx, photo_data, download_seconds)
+
+        for future in as_completed(resizing):
+            idx, photo_data, download_seconds = resizing[future]
+            try:
+                variants, resize_seconds = future.result()
+            except Exception as e:
+                log(f"Error resizing image for photo {photo_data['id']}: {e}")
+                continue
+            images[idx] = _store(jobs[idx], photo_data, variants)
+            log(f"Downloaded and saved image: {images[idx]['filename']} "
+                f"(download {download_seconds:.2f}s, resize {resize_seconds:.2f}s)")
+
+    return images
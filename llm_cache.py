@@ -0,0 +1,93 @@
+"""
+Content-addressed cache for Ollama responses.
+
+Responses are stored in a small SQLite database keyed by a hash of the
+request (model, prompt, temperature, max_tokens), so identical prompts --
+cross-listed abstracts, retries, reruns after a failed upload -- skip
+inference. Entries expire after LLM_CACHE_TTL_DAYS and the least recently
+used entries are evicted beyond LLM_CACHE_MAX_ENTRIES.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from config import get_settings
+
+_lock = threading.Lock()
+_connection = None
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def _connect():
+    """Open the cache database once per process."""
+    global _connection
+    if _connection is None:
+        cache_file = get_settings().cache.llm_cache_file
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        _connection = sqlite3.connect(cache_file, check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        _connection.commit()
+    return _connection
+
+
+def cache_key(**request):
+    """Hash the request parameters that determine an Ollama response."""
+    encoded = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def get(key):
+    """Return the cached response for a key, or None on a miss."""
+    now = time.time()
+    with _lock:
+        db = _connect()
+        row = db.execute(
+            "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+            (key, now - get_settings().llm_cache.ttl_days * 86400),
+        ).fetchone()
+        if row is None:
+            _stats['misses'] += 1
+            return None
+        db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        db.commit()
+        _stats['hits'] += 1
+        return row[0]
+
+
+def put(key, response):
+    """Store a response and evict expired and least recently used entries."""
+    settings = get_settings().llm_cache
+    now = time.time()
+    with _lock:
+        db = _connect()
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, response, now, now),
+        )
+        evicted = db.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - settings.ttl_days * 86400,)
+        ).rowcount
+        evicted += db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (settings.max_entries,),
+        ).rowcount
+        db.commit()
+        _stats['evictions'] += evicted
+
+
+def stats():
+    """Return hit/miss/eviction counters for this process."""
+    with _lock:
+        return dict(_stats)
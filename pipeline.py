@@ -0,0 +1,224 @@
+# pipeline.py - Category pipeline engine shared by every arXiv aggregator
+import os
+import sys
+from datetime import datetime
+
+from categories import CATEGORIES, get_category
+from arxiv_fetch import fetch_category, fetch_batch, articles_fingerprint
+from generate_html import write_html_file
+from config import get_settings
+from content_utils import log
+from featured_tracker import select_featured_article
+from article_store import put_result, save_results
+from rewrite_stage import rewrite_articles
+import archive
+import search_index
+import state_store
+import unsplash_cache
+import image_stage
+import precompress
+import publisher
+import ftp_pool
+
+# During development, limit number of articles fetched
+MAX_ARTICLES = 8
+
+
+def fetch_recent_arxiv(category):
+    """Return (articles, changed) for a single category's own feed."""
+    return fetch_category(category, MAX_ARTICLES)
+
+
+def attach_images(image_articles, rewrites):
+    """Make sure every (article, is_featured) pair has an image in its rewrite.
+
+    Stored images from earlier runs are reused while all of their files are
+    still in output/ (see image_stage.is_reusable); the rest are fetched
+    together by image_stage.generate_images.
+    """
+    jobs = []
+    for article, is_featured in image_articles:
+        rewrite = rewrites[article['id']]
+        size = 'featured' if is_featured else 'thumbnail'
+        image_data = rewrite['images'].get(size)
+        if not image_data or not image_stage.is_reusable(image_data, is_featured):
+            jobs.append({
+                'id': article['id'],
+                'title': rewrite['title'],
+                'summary': rewrite['blurb'],
+                'is_featured': is_featured,
+                'keyword': rewrite.get('keyword'),
+            })
+
+    if jobs and not get_settings().is_configured('unsplash'):
+        log(f"Unsplash is not configured; skipping {len(jobs)} images")
+        return
+
+    for job, image_data in zip(jobs, image_stage.generate_images(jobs)):
+        rewrite = rewrites[job['id']]
+        rewrite['keyword'] = job['keyword']
+        if image_data:
+            rewrite['images']['featured' if job['is_featured'] else 'thumbnail'] = image_data
+
+
+def process_article(article, rewrite, is_featured=False, with_image=False):
+    """Build the page entry for an article from its rewrite and attached image."""
+    new_summary = rewrite['blurb']
+    new_headline = rewrite['title']
+
+    image_data = None
+    if with_image:
+        image_data = rewrite['images'].get('featured' if is_featured else 'thumbnail')
+
+    # Failed generations are retried on the next run rather than stored
+    if new_summary != "[Summary generation failed]":
+        put_result(article['id'], rewrite)
+
+    article_data = {
+        'id': article['id'].split('/')[-1],
+        'title': new_headline,
+        'blurb': new_summary,
+        'url': article['id'],
+    }
+    if is_featured:
+        article_data['featured'] = True
+
+    if image_data:
+        article_data['image'] = image_data
+
+    return article_data
+
+
+def update_search_index():
+    """Index newly archived articles for the site search, if both are enabled."""
+    settings = get_settings()
+    if settings.archive.enabled and settings.search.enabled:
+        search_index.update_index('output')
+
+
+def run_category(category, upload=True, articles=None, changed=None):
+    """Fetch, rewrite, render and publish one category page.
+
+    Args:
+      - category: a descriptor from categories.CATEGORIES, or its key/name
+      - upload: publish the output directory (see publisher.py) after rendering,
+        even when the page was kept: the delta publish is cheap when nothing
+        changed, and it catches up after a run whose publish failed
+      - articles, changed: see generate_category_page
+
+    Returns True when a new page was generated.
+    """
+    generated = generate_category_page(category, articles=articles, changed=changed)
+    unsplash_cache.prune_images()
+    if upload:
+        update_search_index()
+        precompress.compress_output('output')
+        publisher.publish('output')
+    return generated
+
+
+def generate_category_page(category, articles=None, changed=None):
+    """Fetch, rewrite and render one category page into output/.
+
+    Args:
+      - category: a descriptor from categories.CATEGORIES, or its key/name
+      - articles: entries already fetched by a batch query (see arxiv_fetch.fetch_batch);
+        when omitted the category's own feed is fetched
+      - changed: whether the category's entries differ from the ones its current
+        page was built from (see arxiv_fetch.entries_changed)
+
+    Returns True when a new page was generated, False when the existing page
+    was kept (unchanged entries) or there was nothing to process.
+    """
+    if isinstance(category, str):
+        category = get_category(category)
+    name = category['name']
+
+    if articles is None:
+        articles, changed = fetch_recent_arxiv(category)
+    output_path = os.path.join('output', category['output_file'])
+
+    # Nothing to do if the entries are identical to the ones the current page was built from
+    if changed is False and os.path.exists(output_path):
+        log(f"{name} entries unchanged since the last page; keeping {output_path}")
+        return False
+
+    if category['skip_seen']:
+        articles_to_process = [a for a in articles if not state_store.is_seen(a['id'])]
+    else:
+        # Always process the most recent articles, regardless of seen status
+        # This ensures we always display 8 articles on the page
+        articles_to_process = articles[:MAX_ARTICLES]
+
+    if not articles_to_process:
+        log(f"No new {name} articles (or all have been seen). Exiting.")
+        return False
+
+    # Select featured article (avoiding already-featured ones)
+    featured_article, remaining_articles = select_featured_article(articles_to_process)
+
+    if not featured_article:
+        log("No suitable featured article found. Exiting.")
+        return False
+
+    # Rewrite every article concurrently, then fetch all of the page's images at once
+    ordered = [featured_article] + remaining_articles
+    rewrites = rewrite_articles(ordered, category['topic'])
+
+    # Featured article always gets an image; thumbnail for every third article (4, 7, 10, etc.)
+    image_flags = [idx == 1 or (idx - 1) % 3 == 0 for idx in range(1, len(ordered) + 1)]
+    attach_images([(art, idx == 0) for idx, art in enumerate(ordered) if image_flags[idx]], rewrites)
+
+    processed = []
+    for idx, art in enumerate(ordered, start=1):
+        is_featured = idx == 1
+        if is_featured:
+            log(f"Processing featured {name} article: {art['title']}")
+        else:
+            log(f"Processing {name} article {idx}/{len(articles_to_process)}: {art['title']}")
+
+        processed.append(process_article(art, rewrites[art['id']], is_featured=is_featured,
+                                         with_image=image_flags[idx - 1]))
+
+    state_store.mark_seen([art['id'] for art in ordered])
+    save_results()
+    unsplash_cache.save()
+    archiving = get_settings().archive.enabled
+    written = write_html_file(processed, output_path, category=name,
+                              archive_url=archive.index_url(category) if archiving else None)
+    log(f"Generated {name} HTML at {output_path} ({written / 1024:.1f} KB)")
+    # Only now does the page reflect these entries; a run that fails earlier is retried next time
+    state_store.set_page_fingerprint(category['key'], articles_fingerprint(articles))
+    if archiving:
+        # Failed generations are left out, as in the article store
+        archive.update_archive(category, [a for a in processed if a['blurb'] != "[Summary generation failed]"])
+
+    log(f"Finished processing {len(articles_to_process)} {name} articles at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return True
+
+
+def main(argv=None):
+    """Run one or more categories by key, e.g. ``python pipeline.py ml cv``."""
+    args = sys.argv[1:] if argv is None else argv
+    upload = '--no-upload' not in args
+    keys = [a for a in args if not a.startswith('--')] or [c['key'] for c in CATEGORIES]
+    categories = [get_category(key) for key in keys]
+
+    # Several categories share one combined arXiv query
+    fetched, changed = fetch_batch(categories, MAX_ARTICLES) if len(categories) > 1 else ({}, {})
+    for category in categories:
+        generate_category_page(category, articles=fetched.get(category['key']),
+                               changed=changed.get(category['key']))
+    image_stage.shutdown()
+    unsplash_cache.prune_images()
+    update_search_index()
+    precompress.compress_output('output')
+
+    # Publish once for all categories, also when every page was kept: only changed files go up
+    if upload:
+        publisher.publish('output')
+        ftp_pool.close_connections()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Precompressed output.
+
+Writes a ``.gz`` (and, when the optional brotli package is installed, a
+``.br``) sibling next to every text file in the output directory, so a web
+server configured for precompressed files (nginx ``gzip_static`` /
+``brotli_static``, Apache MultiViews or rewrite rules) serves the stored
+bytes without compressing on every request.
+
+Compression runs on a thread pool (zlib and brotli release the GIL while
+compressing). A sibling is only rewritten when its source is newer, gzip
+output carries no timestamp so an unchanged page compresses to identical
+bytes (and the publisher skips it), and siblings whose source is gone are
+removed.
+"""
+
+import os
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from config import get_settings
+from content_utils import log
+
+# COMPRESS_FORMATS value -> file suffix
+COMPRESSED_SUFFIXES = {
+    'gzip': '.gz',
+    'br': '.br',
+}
+
+
+def compress_bytes(data, fmt, level):
+    """Compress data in one of COMPRESSED_SUFFIXES' formats."""
+    if fmt == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return brotli.compress(data, quality=level)
+
+
+def available_formats():
+    """Return the configured formats that can be written in this environment."""
+    formats = [fmt for fmt in get_settings().compress.formats if fmt in COMPRESSED_SUFFIXES]
+    if 'br' in formats and brotli is None:
+        log("brotli is not installed; writing gzip siblings only")
+        formats.remove('br')
+    return formats
+
+
+def compress_file(path, formats, levels):
+    """Write the compressed siblings of one file that are missing or older than it.
+
+    Returns (formats written, compressed bytes written). A sibling that would
+    not be smaller than the source is not kept.
+    """
+    mtime = os.path.getmtime(path)
+    written, size = [], 0
+    data = None
+    for fmt in formats:
+        target = path + COMPRESSED_SUFFIXES[fmt]
+        try:
+            if os.path.getmtime(target) >= mtime:
+                continue
+        except OSError:
+            pass
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = compress_bytes(data, fmt, levels[fmt])
+        if len(compressed) >= len(data):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, target)
+        written.append(fmt)
+        size += len(compressed)
+    return written, size
+
+
+def compress_output(local_dir='output'):
+    """Bring the compressed siblings of every text file under local_dir up to date.
+
+    Returns a dict with the number of files 'compressed', stale siblings
+    'removed', compressed 'bytes' written and the 'seconds' it took.
+    """
+    settings = get_settings().compress
+    formats = available_formats()
+    levels = {'gzip': settings.gzip_level, 'br': settings.brotli_level}
+    suffixes = tuple(COMPRESSED_SUFFIXES.values())
+    started = time.perf_counter()
+
+    sources, removed = [], 0
+    for root, _, files in os.walk(local_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if filename.endswith(suffixes):
+                # Drop siblings of deleted pages (and of formats no longer configured)
+                source, ext = os.path.splitext(path)
+                if not os.path.exists(source) or ext not in (COMPRESSED_SUFFIXES[fmt] for fmt in formats):
+                    os.remove(path)
+                    removed += 1
+            elif filename.endswith(tuple(settings.extensions)):
+                sources.append(path)
+
+    compressed, total = 0, 0
+    if sources and formats:
+        with ThreadPoolExecutor(max_workers=max(1, settings.workers)) as executor:
+            for written, size in executor.map(lambda path: compress_file(path, formats, levels), sources):
+                compressed += bool(written)
+                total += size
+
+    seconds = time.perf_counter() - started
+    if compressed or removed:
+        log(f"Precompressed {compressed} files ({', '.join(formats)}, {total / 1024:.1f} KB) "
+            f"and removed {removed} stale siblings in {seconds:.2f}s")
+    return {'compressed': compressed, 'removed': removed, 'bytes': total, 'seconds': seconds}
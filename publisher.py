@@ -0,0 +1,307 @@
+"""
+Publishing backends for the generated site, selected by PUBLISH_BACKEND.
+
+- ``ftp``: manifest-based delta upload to the web server
+- ``local``: the same delta sync into a directory (PUBLISH_LOCAL_DIR),
+  for offline runs and tests
+- ``tarball``: one compressed snapshot of the site (PUBLISH_TARBALL)
+
+The delta backends hash every file under the output directory and compare
+it against the manifest written by the previous publish
+(PUBLISH_MANIFEST_FILE in the target). Only new or changed files are
+copied and only files that the previous manifest listed but the output
+no longer contains are deleted, so the live site is never emptied and
+files the publisher didn't create are left alone. Registered category
+pages are never deleted: a category that failed or had nothing new keeps
+its live page until a new one replaces it.
+
+Each file is stored under a temporary name and renamed into place, so a
+page is swapped atomically. Images go up before pages (including their
+.gz/.br siblings, which gzip_static/brotli_static serve in their place),
+and orphans are removed after them, so a live page never references a
+missing image.
+
+FTP uploads run in parallel over the shared sessions of ftp_pool, and
+each file's size, time and throughput are logged.
+"""
+
+import io
+import os
+import json
+import ftplib
+import time
+import shutil
+import tarfile
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from categories import output_files
+from config import get_settings
+from content_utils import log
+from precompress import COMPRESSED_SUFFIXES
+import ftp_pool
+
+# Pages and their precompressed siblings, which web servers serve in the page's place
+PAGE_SUFFIXES = ('.html',) + tuple(f".html{suffix}" for suffix in COMPRESSED_SUFFIXES.values())
+
+# Publishing reads and rewrites the target's manifest, so one publish runs at a time
+_publish_lock = threading.Lock()
+
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(local_dir):
+    """Map every file under local_dir (as a '/'-separated relative path) to its hash."""
+    manifest = {}
+    for root, _, files in os.walk(local_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            rel_path = os.path.relpath(path, local_dir).replace(os.sep, '/')
+            manifest[rel_path] = file_hash(path)
+    return manifest
+
+
+def diff_manifests(local, remote):
+    """Return (paths to upload, paths to delete) between a local and the remote manifest."""
+    changed = sorted(path for path, digest in local.items() if remote.get(path) != digest)
+    orphans = sorted(path for path in remote if path not in local)
+    return changed, orphans
+
+
+def _parent_dirs(rel_paths):
+    """Return the parent directories of a set of '/'-separated paths, parents first."""
+    directories = set()
+    for rel_path in rel_paths:
+        parts = rel_path.split('/')[:-1]
+        directories.update('/'.join(parts[:depth]) for depth in range(1, len(parts) + 1))
+    return sorted(directories, key=lambda d: d.count('/'))
+
+
+def _ftp_read_manifest():
+    """Download the previous manifest, or {} if there is none."""
+    buffer = io.BytesIO()
+    try:
+        with ftp_pool.connection() as ftp:
+            ftp.retrbinary(f'RETR {get_settings().publish.manifest_file}', buffer.write)
+        return json.loads(buffer.getvalue().decode('utf-8'))
+    except (ftplib.error_perm, ValueError):
+        return {}
+
+
+def _ftp_prepare_dirs(rel_paths):
+    """Create the remote parent directories of a set of paths, parents first."""
+    with ftp_pool.connection() as ftp:
+        for directory in _parent_dirs(rel_paths):
+            try:
+                ftp.mkd(directory)
+                log(f"Created '{directory}' directory on FTP server")
+            except ftplib.error_perm:
+                # Directory might already exist
+                pass
+
+
+def _ftp_store(ftp, rel_path, fileobj):
+    """Upload to a temporary name and rename it over the live file."""
+    tmp_path = f"{rel_path}.uploading"
+    ftp.storbinary(f'STOR {tmp_path}', fileobj)
+    try:
+        ftp.rename(tmp_path, rel_path)
+    except ftplib.error_perm:
+        # Some servers refuse to rename over an existing file
+        ftp.delete(rel_path)
+        ftp.rename(tmp_path, rel_path)
+
+
+def _ftp_upload(local_path, rel_path):
+    with ftp_pool.connection() as ftp, open(local_path, 'rb') as f:
+        _ftp_store(ftp, rel_path, f)
+
+
+def _ftp_delete(rel_path):
+    with ftp_pool.connection() as ftp:
+        ftp.delete(rel_path)
+
+
+def _ftp_write_manifest(manifest):
+    with ftp_pool.connection() as ftp:
+        _ftp_store(ftp, get_settings().publish.manifest_file,
+                   io.BytesIO(json.dumps(manifest, indent=2).encode('utf-8')))
+
+
+def _local_read_manifest():
+    try:
+        settings = get_settings().publish
+        with open(os.path.join(settings.local_dir, settings.manifest_file), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _local_prepare_dirs(rel_paths):
+    local_dir = get_settings().publish.local_dir
+    os.makedirs(local_dir, exist_ok=True)
+    for directory in _parent_dirs(rel_paths):
+        os.makedirs(os.path.join(local_dir, directory), exist_ok=True)
+
+
+def _local_replace(rel_path, write):
+    """Write a target file under a temporary name via write(tmp_path), then rename it into place."""
+    target = os.path.join(get_settings().publish.local_dir, rel_path)
+    tmp_path = f"{target}.uploading"
+    write(tmp_path)
+    os.replace(tmp_path, target)
+
+
+def _local_upload(local_path, rel_path):
+    _local_replace(rel_path, lambda tmp_path: shutil.copyfile(local_path, tmp_path))
+
+
+def _local_delete(rel_path):
+    os.remove(os.path.join(get_settings().publish.local_dir, rel_path))
+
+
+def _local_write_manifest(manifest):
+    settings = get_settings().publish
+    os.makedirs(settings.local_dir, exist_ok=True)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    _local_replace(settings.manifest_file, write)
+
+
+# Operations of the delta backends: read/write the target's manifest, create
+# directories, copy one file into place, delete one file
+FTP_OPERATIONS = {
+    'read_manifest': _ftp_read_manifest,
+    'prepare_dirs': _ftp_prepare_dirs,
+    'upload': _ftp_upload,
+    'delete': _ftp_delete,
+    'write_manifest': _ftp_write_manifest,
+}
+
+LOCAL_OPERATIONS = {
+    'read_manifest': _local_read_manifest,
+    'prepare_dirs': _local_prepare_dirs,
+    'upload': _local_upload,
+    'delete': _local_delete,
+    'write_manifest': _local_write_manifest,
+}
+
+
+def _upload(operations, local_dir, rel_path):
+    """Upload one file; return (bytes, seconds)."""
+    path = os.path.join(local_dir, rel_path)
+    size = os.path.getsize(path)
+    started = time.perf_counter()
+    operations['upload'](path, rel_path)
+    elapsed = time.perf_counter() - started
+    log(f"Uploaded {rel_path} ({size / 1024:.1f} KB in {elapsed:.2f}s, "
+        f"{size / 1024 / max(elapsed, 1e-6):.0f} KB/s)")
+    return size, elapsed
+
+
+def _upload_all(operations, local_dir, rel_paths, workers):
+    """Upload files in parallel on up to workers threads; return total bytes."""
+    if not rel_paths:
+        return 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(lambda rel_path: _upload(operations, local_dir, rel_path), rel_paths))
+    return sum(size for size, _ in results)
+
+
+def _publish_delta(local_dir, operations, name, workers=1):
+    """Sync local_dir into a target (called name in the log) through its delta operations."""
+    local = build_manifest(local_dir)
+    remote = operations['read_manifest']()
+    changed, orphans = diff_manifests(local, remote)
+    kept = [path for path in orphans if path in output_files()]
+    orphans = [path for path in orphans if path not in kept]
+    for rel_path in kept:
+        log(f"Keeping {rel_path} on {name}: page missing from {local_dir}")
+    log(f"Publishing to {name}: {len(changed)} changed files, "
+        f"deleting {len(orphans)} orphans ({len(local) - len(changed)} unchanged)")
+    operations['prepare_dirs'](changed)
+
+    # Everything else first, then the pages that reference it
+    uploaded_bytes = _upload_all(operations, local_dir, [p for p in changed if not p.endswith(PAGE_SUFFIXES)], workers)
+    uploaded_bytes += _upload_all(operations, local_dir, [p for p in changed if p.endswith(PAGE_SUFFIXES)], workers)
+
+    for rel_path in orphans:
+        try:
+            operations['delete'](rel_path)
+            log(f"Removed {rel_path} from {name}")
+        except (ftplib.error_perm, OSError) as e:
+            log(f"Failed to remove {rel_path} from {name}: {e}")
+
+    # The manifest goes last, so an interrupted publish is retried next time;
+    # kept pages stay listed so they are still managed by later publishes
+    operations['write_manifest'](dict(local, **{path: remote[path] for path in kept}))
+    return {
+        'uploaded': len(changed),
+        'deleted': len(orphans),
+        'unchanged': len(local) - len(changed),
+        'bytes': uploaded_bytes,
+    }
+
+
+def publish_ftp(local_dir='output'):
+    """Delta-upload local_dir to FTP_REMOTE_DIR on the FTP server."""
+    return _publish_delta(local_dir, FTP_OPERATIONS, 'FTP server', workers=get_settings().ftp.max_concurrency)
+
+
+def publish_local(local_dir='output'):
+    """Delta-sync local_dir into PUBLISH_LOCAL_DIR."""
+    return _publish_delta(local_dir, LOCAL_OPERATIONS, get_settings().publish.local_dir)
+
+
+def publish_tarball(local_dir='output'):
+    """Write local_dir as a gzipped tarball to PUBLISH_TARBALL (replaced atomically)."""
+    tarball = get_settings().publish.tarball
+    os.makedirs(os.path.dirname(tarball) or '.', exist_ok=True)
+    tmp_path = f"{tarball}.tmp"
+    count = 0
+    with tarfile.open(tmp_path, 'w:gz') as tar:
+        for rel_path in sorted(build_manifest(local_dir)):
+            tar.add(os.path.join(local_dir, rel_path), arcname=rel_path)
+            count += 1
+    os.replace(tmp_path, tarball)
+    size = os.path.getsize(tarball)
+    log(f"Wrote {count} files to {tarball} ({size / 1024:.1f} KB)")
+    return {'uploaded': count, 'deleted': 0, 'unchanged': 0, 'bytes': size}
+
+
+# PUBLISH_BACKEND value -> publish function
+BACKENDS = {
+    'ftp': publish_ftp,
+    'local': publish_local,
+    'tarball': publish_tarball,
+}
+
+
+def publish(local_dir='output', backend=None):
+    """Publish local_dir through the configured backend (PUBLISH_BACKEND by default).
+
+    Returns a dict with the number of 'uploaded', 'deleted' and 'unchanged'
+    files, the 'bytes' written and the 'seconds' the publish took.
+    """
+    backend = backend or get_settings().publish.backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown publish backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+    started = time.perf_counter()
+    with _publish_lock:
+        result = BACKENDS[backend](local_dir)
+    result['seconds'] = time.perf_counter() - started
+    if result['uploaded']:
+        log(f"Published {result['bytes'] / 1024:.1f} KB in {result['seconds']:.2f}s "
+            f"({result['bytes'] / 1024 / max(result['seconds'], 1e-6):.0f} KB/s overall)")
+    return result
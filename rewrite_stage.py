@@ -0,0 +1,81 @@
+"""
+Concurrent LLM rewrite stage.
+
+Blurb generation for every article in a category is dispatched at once on a
+thread pool sized to OLLAMA_MAX_CONCURRENCY, and each headline is queued as
+soon as its blurb lands, so Ollama's parallel request slots stay busy
+instead of handling one article at a time.
+
+With OLLAMA_COMBINED_MODE enabled each article first gets a single JSON-mode
+request for headline, blurb and image keyword (content_utils.rewrite_combined);
+articles whose combined response fails validation fall back to the separate
+blurb and headline calls.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import get_settings
+from content_utils import log, rewrite_title, rewrite_blurb, rewrite_combined
+from article_store import get_result
+
+
+def rewrite_articles(articles, topic):
+    """Rewrite blurbs and headlines for a list of articles.
+
+    Args:
+        articles: article dicts with 'id', 'title' and 'summary'
+        topic: plain-language topic of the category (passed to the prompts)
+
+    Returns:
+        Dict mapping article ID to a result dict with 'title', 'blurb' and
+        'images', reusing stored results from earlier runs where available.
+    """
+    results = {}
+    pending_articles = []
+    for article in articles:
+        stored = get_result(article['id'])
+        if stored:
+            log(f"Reusing stored rewrite for {article['id']}")
+            stored.setdefault('images', {})
+            results[article['id']] = stored
+        else:
+            pending_articles.append(article)
+
+    if not pending_articles:
+        return results
+
+    settings = get_settings().ollama
+    log(f"Rewriting {len(pending_articles)} {topic} articles with up to {settings.max_concurrency} concurrent Ollama requests")
+    with ThreadPoolExecutor(max_workers=max(1, settings.max_concurrency)) as executor:
+        # Every blurb (or combined request) goes out first; headlines follow as blurbs complete
+        first_stage = ('combined', rewrite_combined) if settings.combined_mode else ('blurb', rewrite_blurb)
+        pending = {
+            executor.submit(first_stage[1], a['title'], a['summary'], topic): (first_stage[0], a)
+            for a in pending_articles
+        }
+        blurbs = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, article = pending.pop(future)
+                if stage == 'combined':
+                    combined = future.result()
+                    if combined:
+                        results[article['id']] = dict(combined, images={})
+                    else:
+                        blurb_future = executor.submit(rewrite_blurb, article['title'], article['summary'], topic)
+                        pending[blurb_future] = ('blurb', article)
+                elif stage == 'blurb':
+                    blurbs[article['id']] = future.result()
+                    headline_future = executor.submit(
+                        rewrite_title, article['title'], topic, article['summary'], blurbs[article['id']]
+                    )
+                    pending[headline_future] = ('headline', article)
+                else:
+                    results[article['id']] = {
+                        'title': future.result(),
+                        'blurb': blurbs[article['id']],
+                        'images': {},
+                    }
+
+    return results
@@ -1,196 +1,142 @@
 #!/usr/bin/env python3
 """
-Master script to run all arXiv aggregators in sequence.
+Master script to run all arXiv aggregators concurrently in one process.
 This provides a single command to generate all category pages.
 """
 
 import sys
-import subprocess
 import time
 import os
-import shutil
-import ftplib
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from featured_tracker import clear_featured_ids
-from config import FTP_HOST, FTP_USER, FTP_PASS, FTP_REMOTE_DIR
+from categories import CATEGORIES, output_files
+from pipeline import generate_category_page, update_search_index, MAX_ARTICLES
+from arxiv_fetch import fetch_batch
+import llm_cache
+import http_client
+import image_stage
+import unsplash_cache
+import precompress
+import publisher
+import ftp_pool
+from config import get_settings
+
+# Image file names referenced by a page (src and srcset entries)
+IMAGE_REFERENCE = re.compile(r'images/([\w.@-]+)')
 
 def log(message):
     """Print timestamped log message."""
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
 
-def clear_ftp_server():
-    """Clear HTML files and images from the FTP server."""
-    try:
-        log("🌐 Connecting to FTP server to clear old content...")
-        with ftplib.FTP(FTP_HOST, FTP_USER, FTP_PASS) as ftp:
-            ftp.encoding = 'utf-8'
-            ftp.cwd(FTP_REMOTE_DIR)
-            
-            # List of HTML files to remove
-            html_files = ["index.html", "ml.html", "cv.html", "cr.html", "ro.html", "hc.html"]
-            cleared_html = 0
-            
-            # Get list of files on server
-            server_files = ftp.nlst()
-            
-            # Remove HTML files
-            for html_file in html_files:
-                if html_file in server_files:
-                    try:
-                        ftp.delete(html_file)
-                        cleared_html += 1
-                        log(f"🗑️  Removed {html_file} from FTP server")
-                    except ftplib.error_perm as e:
-                        log(f"⚠️  Failed to remove {html_file} from FTP server: {e}")
-            
-            # Clear images directory on server
-            cleared_images = 0
-            if 'images' in server_files:
-                try:
-                    # Change to images directory
-                    ftp.cwd('images')
-                    
-                    # Get list of image files
-                    image_files = [f for f in ftp.nlst() if f.endswith('.jpg')]
-                    cleared_images = len(image_files)
-                    
-                    # Remove all image files
-                    for image_file in image_files:
-                        try:
-                            ftp.delete(image_file)
-                        except ftplib.error_perm as e:
-                            log(f"⚠️  Failed to remove {image_file}: {e}")
-                    
-                    # Go back to root directory
-                    ftp.cwd('..')
-                    
-                    if cleared_images > 0:
-                        log(f"🗑️  Removed {cleared_images} image files from FTP server")
-                        
-                except ftplib.error_perm as e:
-                    log(f"⚠️  Failed to access images directory on FTP server: {e}")
-            
-            # Summary
-            if cleared_html > 0 or cleared_images > 0:
-                log(f"🌐 FTP cleanup complete: {cleared_html} HTML files, {cleared_images} images cleared")
-            else:
-                log("🌐 No files to clear on FTP server")
-                
-    except Exception as e:
-        log(f"❌ Failed to connect to FTP server for cleanup: {e}")
-        log("⚠️  Continuing with local cleanup only...")
+def prune_unused_images():
+    """Remove images in output/images that no category page references any more.
 
-def clear_generated_content():
-    """Clear all generated HTML files and images from the output directory."""
-    output_dir = "output"
-    
-    if not os.path.exists(output_dir):
-        log("📁 Output directory doesn't exist, nothing to clear")
+    Pages are kept until a new version replaces them, so an image is only
+    dropped once no current page (new or kept from an earlier run) uses it.
+    """
+    images_dir = os.path.join("output", "images")
+    if not os.path.isdir(images_dir):
         return
-    
-    # Clear HTML files
-    html_files = ["index.html", "ml.html", "cv.html", "cr.html", "ro.html", "hc.html"]
-    cleared_html = 0
-    
-    for html_file in html_files:
-        html_path = os.path.join(output_dir, html_file)
-        if os.path.exists(html_path):
-            try:
-                os.remove(html_path)
-                cleared_html += 1
-                log(f"🗑️  Removed {html_file}")
-            except Exception as e:
-                log(f"⚠️  Failed to remove {html_file}: {e}")
-    
-    # Clear images directory
-    images_dir = os.path.join(output_dir, "images")
-    cleared_images = 0
-    
-    if os.path.exists(images_dir):
+
+    referenced = set()
+    for page in output_files():
         try:
-            # Count files before clearing
-            image_files = [f for f in os.listdir(images_dir) if f.endswith('.jpg')]
-            cleared_images = len(image_files)
-            
-            # Remove the entire images directory and recreate it
-            shutil.rmtree(images_dir)
-            os.makedirs(images_dir)
-            
-            if cleared_images > 0:
-                log(f"🗑️  Removed {cleared_images} image files from images directory")
-        except Exception as e:
-            log(f"⚠️  Failed to clear images directory: {e}")
-    
-    # Summary
-    if cleared_html > 0 or cleared_images > 0:
-        log(f"🧹 Local cleanup complete: {cleared_html} HTML files, {cleared_images} images cleared")
-    else:
-        log("🧹 No local files to clear")
+            with open(os.path.join("output", page), 'r', encoding='utf-8') as f:
+                referenced.update(IMAGE_REFERENCE.findall(f.read()))
+        except FileNotFoundError:
+            continue
+
+    removed = 0
+    for entry in os.scandir(images_dir):
+        if entry.is_file() and entry.name.endswith(image_stage.IMAGE_EXTENSIONS) and entry.name not in referenced:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                log(f"⚠️  Failed to remove {entry.name}: {e}")
+    if removed:
+        log(f"🧹 Removed {removed} images no longer used by any page")
 
-def run_aggregator(script_name, category_name):
-    """Run a single aggregator script and handle errors."""
+def run_aggregator(category, articles=None, changed=None):
+    """Run a single category pipeline in-process and handle errors."""
+    category_name = category['name']
     log(f"Starting {category_name} aggregator...")
+    start_time = time.time()
     
     try:
-        # Run the aggregator script
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, 
-                              text=True, 
-                              timeout=600)  # 10 minute timeout
-        
-        if result.returncode == 0:
-            log(f"✅ {category_name} aggregator completed successfully")
-            return True
-        else:
-            log(f"❌ {category_name} aggregator failed with exit code {result.returncode}")
-            if result.stderr:
-                log(f"Error output: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        log(f"❌ {category_name} aggregator timed out after 10 minutes")
-        return False
+        generate_category_page(category, articles=articles, changed=changed)
+        log(f"✅ {category_name} aggregator completed successfully in {time.time() - start_time:.1f}s")
+        return True
     except Exception as e:
         log(f"❌ {category_name} aggregator failed with exception: {e}")
         return False
 
 def main():
-    """Run all aggregators in sequence."""
+    """Run all aggregators concurrently on a shared worker pool."""
     log("🚀 Starting arXiv aggregator batch run...")
-    
-    # Clear featured article tracking to start fresh
-    clear_featured_ids()
-    log("🔄 Cleared featured article tracking for fresh batch")
-    
-    # Clear generated content to conserve server resources and ensure fresh content
-    clear_ftp_server()  # Clear FTP server first
-    clear_generated_content()  # Then clear local files
-    
     start_time = time.time()
     
-    # List of aggregators to run: (script_name, display_name)
-    aggregators = [
-        ("aggregator.py", "AI Research"),
-        ("aggregator_ml.py", "Machine Learning"),
-        ("aggregator_cv.py", "Computer Vision"),
-        ("aggregator_cr.py", "Security/Cryptography"),
-        ("aggregator_ro.py", "Robotics"),
-        ("aggregator_hc.py", "Human-Computer Interaction"),
-    ]
+    # One combined arXiv query for every category, routed locally
+    try:
+        fetched, changed = fetch_batch(CATEGORIES, MAX_ARTICLES)
+    except Exception as e:
+        log(f"⚠️  Batched arXiv fetch failed, categories will fetch individually: {e}")
+        fetched, changed = {}, {}
     
+    # Skip regeneration when no category's entries changed and every page from the last run is
+    # still in place; the publish below still runs, to catch up after a batch whose publish failed
+    pages_present = all(os.path.exists(os.path.join('output', f)) for f in output_files())
     results = {}
-    
-    for script_name, category_name in aggregators:
-        success = run_aggregator(script_name, category_name)
-        results[category_name] = success
+    if changed and not any(changed.values()) and pages_present:
+        log("💤 arXiv entries unchanged since last batch; nothing to regenerate")
+        results = {category['name']: True for category in CATEGORIES}
+    else:
+        # Clear featured article tracking to start fresh
+        clear_featured_ids()
+        log("🔄 Cleared featured article tracking for fresh batch")
         
-        if success:
-            log(f"✅ {category_name} page generated and uploaded")
-        else:
-            log(f"❌ {category_name} page failed")
+        # Schedule every category at once; per-dependency limits in concurrency.py
+        # keep arXiv, Ollama, Unsplash and FTP from being overwhelmed
+        with ThreadPoolExecutor(max_workers=max(1, get_settings().batch.workers)) as executor:
+            futures = {
+                category['name']: executor.submit(
+                    run_aggregator, category, fetched.get(category['key']), changed.get(category['key'])
+                )
+                for category in CATEGORIES
+            }
         
-        # Small delay between aggregators to avoid overwhelming APIs
-        time.sleep(2)
+        for category_name, future in futures.items():
+            success = future.result()
+            results[category_name] = success
+            
+            if success:
+                log(f"✅ {category_name} page generated")
+            else:
+                log(f"❌ {category_name} page failed")
+    
+    # Pages that weren't rebuilt keep their images; drop the rest, and expired photos from the cache
+    prune_unused_images()
+    unsplash_cache.prune_images()
+
+    # Index the newly archived articles, then write .gz/.br siblings of the new files before they go up
+    update_search_index()
+    precompress.compress_output('output')
+
+    # Publish once for the whole batch: only changed files go up, orphans are removed
+    publish_failed = False
+    try:
+        published = publisher.publish('output')
+        log(f"🌐 Published in {published['seconds']:.1f}s: {published['uploaded']} uploaded "
+            f"({published['bytes'] / 1024:.1f} KB), {published['deleted']} deleted, {published['unchanged']} unchanged")
+    except Exception as e:
+        log(f"❌ Publishing failed: {e}")
+        publish_failed = True
+    
+    http_client.close_sessions()
+    ftp_pool.close_connections()
+    image_stage.shutdown()
     
     # Summary
     elapsed_time = time.time() - start_time
@@ -205,9 +151,15 @@ def main():
             success_count += 1
     
     log("=" * 50)
-    log(f"Total: {success_count}/{len(aggregators)} aggregators completed successfully")
+    cache_stats = llm_cache.stats()
+    log(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+        f"{cache_stats['evictions']} evictions")
+    log(f"Total: {success_count}/{len(CATEGORIES)} aggregators completed successfully")
     
-    if success_count == len(aggregators):
+    if publish_failed:
+        log("⚠️  The site was not published. Check logs above for details.")
+        return 1
+    if success_count == len(CATEGORIES):
         log("🎉 All aggregators completed successfully!")
         return 0
     else:
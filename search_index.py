@@ -0,0 +1,212 @@
+"""
+Static full-text search over every archived article.
+
+Builds an inverted index over the title, blurb, arXiv ID and category of
+each article in the archive (see archive.py) and ships it as JSON files
+that search.js queries in the browser, with no server-side code:
+
+    output/search/meta.json          shard layout, stopwords, document count
+    output/search/terms-<n>.json     term -> sorted document numbers, for terms hashing to shard n
+    output/search/docs-<n>.json      document number -> [title, blurb, url, category, day, arXiv ID]
+
+Terms are assigned to SEARCH_TERM_SHARDS shards by an FNV-1a hash of
+their code points, so the client fetches only the shards of the words it
+looks up. Document numbers are the archive's row IDs, which only grow:
+each run reads the articles archived since the last build and rewrites
+only the term shards those articles touch and the last document shard.
+Build time, corpus size and shard sizes are appended to
+CACHE_DIR/search_index_metrics.jsonl on every build.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import threading
+from datetime import datetime
+
+from categories import CATEGORIES
+from config import get_settings
+from content_utils import log
+from generate_html import load_template, iter_template, write_chunks_file
+import archive
+import state_store
+
+SEARCH_DIR = 'search'
+INDEX_VERSION = 1
+
+# Source of the client-side lookup, copied to output/search.js
+SEARCH_SCRIPT = os.path.join('static', 'search.js')
+
+# Too common in headlines and blurbs to narrow a search; search.js drops them from queries too
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has how in into is it its new of on or that the their this "
+    "to up we what when which while with".split()
+)
+
+_WORD = re.compile(r'[^\W_]+')
+
+# Index updates read and rewrite shared shard files, so one runs at a time
+_index_lock = threading.Lock()
+
+
+def term_shard(term, shards):
+    """Return the shard number of a term (32-bit FNV-1a over its code points, as in search.js)."""
+    h = 0x811c9dc5
+    for char in term:
+        h = ((h ^ ord(char)) * 0x01000193) & 0xffffffff
+    return h % shards
+
+
+def tokenize(text):
+    """Return the indexable words of a text: lowercased, at least two characters, no stopwords."""
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in STOPWORDS}
+
+
+def document_terms(category, paper_id, title, blurb):
+    """Return every term a document is found by."""
+    terms = tokenize(f"{title} {blurb}")
+    terms.add(paper_id.lower())
+    terms.add(category)
+    return terms
+
+
+def _read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path, data):
+    """Write compact JSON through a temporary file; return its size in bytes."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _write_search_page(local_dir):
+    """Write search.html (in the default template) and copy search.js next to it."""
+    links = [(f"{category['name']} archive", archive.index_url(category)) for category in CATEGORIES]
+    sidebar = ''.join(f"""        <article class="sidebar-article">
+          <h3><a href="{url}">{label}</a></h3>
+        </article>
+""" for label, url in links)
+    write_chunks_file(iter_template(load_template(), {
+        'articles': """
+      <article class="featured-article">
+        <div class="category-tag">SEARCH</div>
+        <h1>Search All Articles</h1>
+        <form id="search-form" role="search">
+          <input id="search-input" type="search" name="q" placeholder="Words or an arXiv ID" autocomplete="off" />
+        </form>
+        <p id="search-status" class="byline"></p>
+      </article>
+
+      <div id="search-results" class="articles-grid"></div>
+      <script src="search.js" defer></script>
+""",
+        'sidebar': sidebar,
+        'date': datetime.now().strftime("%B %d, %Y"),
+    }), os.path.join(local_dir, 'search.html'))
+    shutil.copyfile(SEARCH_SCRIPT, os.path.join(local_dir, 'search.js'))
+
+
+def update_index(local_dir='output'):
+    """Add articles archived since the last build to the search index.
+
+    Rebuilds from scratch when the index is missing or its shard layout
+    settings changed. Returns the build metrics dict (also appended to the
+    metrics file), or None when there was nothing new to index.
+    """
+    settings = get_settings().search
+    index_dir = os.path.join(local_dir, SEARCH_DIR)
+    meta_path = os.path.join(index_dir, 'meta.json')
+
+    with _index_lock:
+        started = time.perf_counter()
+        meta = _read_json(meta_path, None)
+        layout = {'version': INDEX_VERSION, 'term_shards': settings.term_shards,
+                  'docs_per_shard': settings.docs_per_shard}
+        if not meta or any(meta.get(key) != value for key, value in layout.items()):
+            # First build, or a different shard layout: start over
+            shutil.rmtree(index_dir, ignore_errors=True)
+            meta = dict(layout, documents=0, last_rowid=0)
+        os.makedirs(index_dir, exist_ok=True)
+
+        rows = state_store.archived_since(meta['last_rowid'])
+        if not rows and os.path.exists(os.path.join(local_dir, 'search.html')):
+            return None
+
+        # Group the new postings and documents by the shard files they belong in
+        postings, documents = {}, {}
+        for rowid, category, paper_id, day, title, blurb, url in rows:
+            for term in document_terms(category, paper_id, title, blurb):
+                postings.setdefault(term_shard(term, settings.term_shards), {}).setdefault(term, []).append(rowid)
+            documents.setdefault(rowid // settings.docs_per_shard, {})[str(rowid)] = [
+                title, blurb, url, category, day, paper_id]
+
+        sizes = {}
+        for shard, terms in postings.items():
+            name = f"terms-{shard}.json"
+            index = _read_json(os.path.join(index_dir, name), {})
+            for term, doc_ids in terms.items():
+                # Row IDs only grow, so appending keeps every posting list sorted (and
+                # skipping IDs already present repairs a build interrupted before meta.json)
+                existing = index.setdefault(term, [])
+                existing.extend(doc_id for doc_id in doc_ids if not existing or doc_id > existing[-1])
+            sizes[name] = _write_json(os.path.join(index_dir, name), index)
+        for shard, docs in documents.items():
+            name = f"docs-{shard}.json"
+            stored = _read_json(os.path.join(index_dir, name), {})
+            stored.update(docs)
+            sizes[name] = _write_json(os.path.join(index_dir, name), stored)
+
+        if rows:
+            meta['last_rowid'] = rows[-1][0]
+            meta['documents'] += len(rows)
+        meta['stopwords'] = sorted(STOPWORDS)
+        meta['updated'] = datetime.now().isoformat(timespec='seconds')
+        _write_json(meta_path, meta)
+        _write_search_page(local_dir)
+
+        shard_sizes = [entry.stat().st_size for entry in os.scandir(index_dir)
+                       if entry.name.startswith(('terms-', 'docs-'))]
+        metrics = {
+            'built_at': meta['updated'],
+            'documents': meta['documents'],
+            'added': len(rows),
+            'seconds': round(time.perf_counter() - started, 4),
+            'shards_written': len(sizes),
+            'bytes_written': sum(sizes.values()),
+            'shards': len(shard_sizes),
+            'total_bytes': sum(shard_sizes),
+            'largest_shard_bytes': max(shard_sizes, default=0),
+        }
+
+    metrics_file = get_settings().cache.search_metrics_file
+    os.makedirs(os.path.dirname(metrics_file) or '.', exist_ok=True)
+    with open(metrics_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(metrics) + '\n')
+    log(f"Search index: {metrics['added']} new of {metrics['documents']} articles in {metrics['seconds']:.2f}s, "
+        f"{metrics['shards_written']} shards written ({metrics['bytes_written'] / 1024:.1f} KB), "
+        f"largest shard {metrics['largest_shard_bytes'] / 1024:.1f} KB")
+    return metrics
+
+
+def main(argv=None):
+    """Update the index, or rebuild it with ``python search_index.py --rebuild``."""
+    args = sys.argv[1:] if argv is None else argv
+    if '--rebuild' in args:
+        shutil.rmtree(os.path.join('output', SEARCH_DIR), ignore_errors=True)
+    update_index('output')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Shared state store for seen and featured arXiv IDs.
+
+Backed by SQLite in WAL mode so categories running in threads or in
+separate processes can check membership with an indexed lookup and claim
+a featured article atomically, instead of each rewriting whole JSON files
+and losing each other's updates. Existing seen_arxiv_ids.json and
+featured_arxiv_ids.json files are imported the first time the store is
+opened.
+
+IDs are stored version-insensitively (``2506.05314v1`` and ``v2`` of the
+same paper share one key), and the seen index is bounded: entries older
+than SEEN_RETENTION_DAYS or beyond the newest SEEN_MAX_ENTRIES are pruned.
+Opening the store costs the same regardless of how much history it holds.
+
+It also keeps the text of every published article per category and day,
+which archive.py renders into the site's archive pages.
+"""
+
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from config import SEEN_IDS_FILE, FEATURED_IDS_FILE, get_settings
+
+_VERSION_SUFFIX = re.compile(r'v\d+$')
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    """Return this thread's connection, creating the schema on first use."""
+    global _initialized
+    db = getattr(_local, 'connection', None)
+    if db is None:
+        db = sqlite3.connect(get_settings().state.db_file, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        _local.connection = db
+    with _init_lock:
+        if not _initialized:
+            _create_schema(db)
+            _initialized = True
+    return db
+
+
+def normalize_id(article_id):
+    """Reduce an arXiv entry ID or URL to its version-less paper ID.
+
+    http://arxiv.org/abs/2506.05314v2 -> 2506.05314, http://arxiv.org/abs/cs/9904005v1 -> cs/9904005
+    """
+    paper_id = article_id.split('/abs/')[-1]
+    return _VERSION_SUFFIX.sub('', paper_id)
+
+
+def _create_schema(db):
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("CREATE TABLE IF NOT EXISTS seen_papers (paper_id TEXT PRIMARY KEY, first_seen REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS seen_papers_first_seen ON seen_papers (first_seen)")
+        db.execute("CREATE TABLE IF NOT EXISTS featured_papers (paper_id TEXT PRIMARY KEY, featured_at REAL NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS archived_articles ("
+                   " category TEXT NOT NULL, paper_id TEXT NOT NULL, day TEXT NOT NULL, added_at REAL NOT NULL,"
+                   " title TEXT NOT NULL, blurb TEXT NOT NULL, url TEXT NOT NULL,"
+                   " PRIMARY KEY (category, paper_id))")
+        db.execute("CREATE INDEX IF NOT EXISTS archived_articles_day ON archived_articles (category, day)")
+        migrated = db.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if not migrated:
+            now = time.time()
+            db.executemany("INSERT OR IGNORE INTO seen_papers (paper_id, first_seen) VALUES (?, ?)",
+                           [(normalize_id(i), now) for i in _read_json_ids(SEEN_IDS_FILE)])
+            db.executemany("INSERT OR IGNORE INTO featured_papers (paper_id, featured_at) VALUES (?, ?)",
+                           [(normalize_id(i), now) for i in _read_json_ids(FEATURED_IDS_FILE)])
+            db.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def _read_json_ids(path):
+    """Read a legacy JSON list of IDs, returning [] if it doesn't exist."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return list(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def is_seen(article_id):
+    """Return True if any version of a paper has been processed before."""
+    row = _connect().execute("SELECT 1 FROM seen_papers WHERE paper_id = ?",
+                             (normalize_id(article_id),)).fetchone()
+    return row is not None
+
+
+def seen_ids():
+    """Return the set of processed (version-less) paper IDs."""
+    return {row[0] for row in _connect().execute("SELECT paper_id FROM seen_papers")}
+
+
+def mark_seen(article_ids):
+    """Record articles as processed and prune the seen index."""
+    now = time.time()
+    _connect().executemany("INSERT OR IGNORE INTO seen_papers (paper_id, first_seen) VALUES (?, ?)",
+                           [(normalize_id(i), now) for i in article_ids])
+    prune_seen()
+
+
+def prune_seen(max_age_days=None, max_entries=None):
+    """Drop seen entries older than max_age_days and all but the newest max_entries.
+
+    Both default to the SEEN_RETENTION_DAYS and SEEN_MAX_ENTRIES settings.
+    Returns the number of entries removed.
+    """
+    settings = get_settings().state
+    if max_age_days is None:
+        max_age_days = settings.seen_retention_days
+    if max_entries is None:
+        max_entries = settings.seen_max_entries
+    db = _connect()
+    removed = db.execute("DELETE FROM seen_papers WHERE first_seen < ?",
+                         (time.time() - max_age_days * 86400,)).rowcount
+    removed += db.execute(
+        "DELETE FROM seen_papers WHERE paper_id IN ("
+        " SELECT paper_id FROM seen_papers ORDER BY first_seen DESC LIMIT -1 OFFSET ?)",
+        (max_entries,),
+    ).rowcount
+    return removed
+
+
+def featured_ids():
+    """Return the set of (version-less) paper IDs featured in the current batch."""
+    return {row[0] for row in _connect().execute("SELECT paper_id FROM featured_papers")}
+
+
+def is_featured(article_id):
+    """Return True if any version of a paper has already been featured."""
+    row = _connect().execute("SELECT 1 FROM featured_papers WHERE paper_id = ?",
+                             (normalize_id(article_id),)).fetchone()
+    return row is not None
+
+
+def claim_featured(article_id):
+    """Atomically mark a paper as featured.
+
+    Returns True if this call claimed it, False if another category already had.
+    """
+    cursor = _connect().execute("INSERT OR IGNORE INTO featured_papers (paper_id, featured_at) VALUES (?, ?)",
+                                (normalize_id(article_id), time.time()))
+    return cursor.rowcount == 1
+
+
+def clear_featured():
+    """Forget all featured IDs (start of a fresh batch)."""
+    _connect().execute("DELETE FROM featured_papers")
+
+
+def archive_articles(category, articles, day):
+    """Record published articles (dicts with id, title, blurb, url) under a category and day.
+
+    A paper stays on the day it was first archived. Returns the number of
+    articles that were new to the category's archive.
+    """
+    now = time.time()
+    cursor = _connect().executemany(
+        "INSERT OR IGNORE INTO archived_articles (category, paper_id, day, added_at, title, blurb, url)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(category, normalize_id(a['id']), day, now, a['title'], a['blurb'], a['url']) for a in articles],
+    )
+    return cursor.rowcount
+
+
+def archived_days(category):
+    """Return the days (YYYY-MM-DD) with archived articles for a category, oldest first, with counts."""
+    return _connect().execute(
+        "SELECT day, COUNT(*) FROM archived_articles WHERE category = ? GROUP BY day ORDER BY day",
+        (category,),
+    ).fetchall()
+
+
+def archived_on(category, day):
+    """Return the articles archived for a category on one day, in the order they were published."""
+    rows = _connect().execute(
+        "SELECT paper_id, title, blurb, url FROM archived_articles WHERE category = ? AND day = ?"
+        " ORDER BY added_at, rowid",
+        (category, day),
+    ).fetchall()
+    return [{'id': paper_id, 'title': title, 'blurb': blurb, 'url': url} for paper_id, title, blurb, url in rows]
+
+
+def archived_since(rowid):
+    """Return archived articles added after rowid, as (rowid, category, paper_id, day, title, blurb, url) rows.
+
+    Row IDs only grow, so they serve as stable document numbers for the search index.
+    """
+    return _connect().execute(
+        "SELECT rowid, category, paper_id, day, title, blurb, url FROM archived_articles"
+        " WHERE rowid > ? ORDER BY rowid",
+        (rowid,),
+    ).fetchall()
+
+
+def page_fingerprint(category):
+    """Return the fingerprint of the entries a category's current page was built from, or None."""
+    row = _connect().execute("SELECT value FROM meta WHERE key = ?", (f"page_fingerprint:{category}",)).fetchone()
+    return row[0] if row else None
+
+
+def set_page_fingerprint(category, fingerprint):
+    """Record the entries fingerprint of a page that was just written."""
+    _connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                       (f"page_fingerprint:{category}", fingerprint))
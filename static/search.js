@@ -0,0 +1,157 @@
+// Client-side lookup for the static search index written by search_index.py.
+//
+// A query is split into the same terms the index was built from; only the
+// term shards of those terms are fetched, their posting lists intersected,
+// and the newest matches' documents loaded from the document shards.
+(function () {
+  'use strict';
+
+  var INDEX_URL = 'search/';
+  var MAX_RESULTS = 50;
+  var ARXIV_ID = /^((?:[a-z-]+(?:\.[a-z]{2})?\/\d{7})|(?:\d{4}\.\d{4,5}))(?:v\d+)?$/;
+  var cache = new Map();
+
+  function fetchJSON(name) {
+    if (!cache.has(name)) {
+      cache.set(name, fetch(INDEX_URL + name).then(function (response) {
+        if (!response.ok) {
+          throw new Error(name + ': HTTP ' + response.status);
+        }
+        return response.json();
+      }));
+    }
+    return cache.get(name);
+  }
+
+  // 32-bit FNV-1a over code points, as search_index.term_shard
+  function termShard(term, shards) {
+    var h = 0x811c9dc5;
+    for (var ch of term) {
+      h = Math.imul(h ^ ch.codePointAt(0), 0x01000193) >>> 0;
+    }
+    return h % shards;
+  }
+
+  function queryTerms(query, stopwords) {
+    var terms = new Set();
+    query.toLowerCase().split(/\s+/).forEach(function (word) {
+      var id = word.replace(/^.*\/abs\//, '').match(ARXIV_ID);
+      if (id) {
+        terms.add(id[1]);
+        return;
+      }
+      (word.match(/[\p{L}\p{N}]+/gu) || []).forEach(function (token) {
+        if (token.length > 1 && !stopwords.has(token)) {
+          terms.add(token);
+        }
+      });
+    });
+    return Array.from(terms);
+  }
+
+  function intersect(lists) {
+    lists.sort(function (a, b) { return a.length - b.length; });
+    return lists.reduce(function (acc, list) {
+      var keep = new Set(list);
+      return acc.filter(function (id) { return keep.has(id); });
+    });
+  }
+
+  async function search(query) {
+    var meta = await fetchJSON('meta.json');
+    var terms = queryTerms(query, new Set(meta.stopwords));
+    if (!terms.length) {
+      return { terms: terms, total: 0, docs: [] };
+    }
+
+    var lists = await Promise.all(terms.map(function (term) {
+      return fetchJSON('terms-' + termShard(term, meta.term_shards) + '.json').then(function (shard) {
+        return shard[term] || [];
+      });
+    }));
+    // Newest articles first
+    var ids = intersect(lists).sort(function (a, b) { return b - a; });
+    var shown = ids.slice(0, MAX_RESULTS);
+
+    var shards = Array.from(new Set(shown.map(function (id) { return Math.floor(id / meta.docs_per_shard); })));
+    var loaded = await Promise.all(shards.map(function (shard) { return fetchJSON('docs-' + shard + '.json'); }));
+    var byShard = new Map(shards.map(function (shard, i) { return [shard, loaded[i]]; }));
+    var docs = shown.map(function (id) {
+      var doc = byShard.get(Math.floor(id / meta.docs_per_shard))[String(id)];
+      return { title: doc[0], blurb: doc[1], url: doc[2], category: doc[3], day: doc[4], arxivId: doc[5] };
+    });
+    return { terms: terms, total: ids.length, docs: docs };
+  }
+
+  function element(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) {
+      node.className = className;
+    }
+    if (text) {
+      node.textContent = text;
+    }
+    return node;
+  }
+
+  function render(result, results, status) {
+    results.textContent = '';
+    if (!result.terms.length) {
+      status.textContent = '';
+      return;
+    }
+    status.textContent = result.total === 0 ? 'No articles found.' :
+      result.total + ' article' + (result.total === 1 ? '' : 's') + ' found' +
+      (result.total > result.docs.length ? ', showing the newest ' + result.docs.length : '') + '.';
+
+    result.docs.forEach(function (doc) {
+      var article = element('article', 'article');
+      article.appendChild(element('h2', null, doc.title.replace(/\.+$/, '')));
+      article.appendChild(element('p', 'byline', doc.day + ' • ' + doc.category.toUpperCase() + ' • arXiv ' + doc.arxivId));
+      article.appendChild(element('p', 'summary', doc.blurb));
+      var link = element('a', 'read-more', 'Read Paper →');
+      link.href = doc.url.replace('/abs/', '/pdf/');
+      link.target = '_blank';
+      article.appendChild(link);
+      results.appendChild(article);
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var form = document.getElementById('search-form');
+    var input = document.getElementById('search-input');
+    var results = document.getElementById('search-results');
+    var status = document.getElementById('search-status');
+    var pending = null;
+    var latest = 0;
+
+    function run() {
+      var query = input.value.trim();
+      var ticket = ++latest;
+      history.replaceState(null, '', query ? '?q=' + encodeURIComponent(query) : location.pathname);
+      search(query).then(function (result) {
+        // Ignore answers to queries the reader has already typed past
+        if (ticket === latest) {
+          render(result, results, status);
+        }
+      }).catch(function (error) {
+        status.textContent = 'Search is unavailable: ' + error.message;
+      });
+    }
+
+    form.addEventListener('submit', function (event) {
+      event.preventDefault();
+      run();
+    });
+    input.addEventListener('input', function () {
+      clearTimeout(pending);
+      pending = setTimeout(run, 200);
+    });
+
+    var initial = new URLSearchParams(location.search).get('q');
+    if (initial) {
+      input.value = initial;
+      run();
+    }
+  });
+})();
@@ -0,0 +1,104 @@
+"""
+Precompiled cleaner for LLM-generated text.
+
+All narrative-removal rules for a task are compiled once into a single
+alternation and applied in one ``sub`` pass, instead of compiling and
+running ~20 separate patterns per call. Rule sets are per task:
+
+- ``headline`` (also the default) keeps every rule, including the ones that
+  drop all text after "This headline", "The focus is" or "rather than",
+  since that is where models put their commentary on a headline.
+- ``blurb`` leaves those prose phrases alone -- "uses X rather than Y" is a
+  legitimate sentence in a summary -- and only removes "(I ...)" asides.
+- ``keyword`` only strips line-leading prefixes.
+
+benchmarks/bench_clean_text.py checks the default rules against the
+original implementation and measures throughput.
+"""
+
+import re
+
+_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL
+
+# Line-leading narrative prefixes and option labels
+PREFIX_PATTERNS = [
+    r'^Here.*?:',
+    r'^Two sentences.*?:',
+    r'^Explanation.*?:',
+    r'^Story.*?:',
+    r'^Headline.*?:',
+    r'^\*\*.*?\*\*',  # Remove **Style 1:** etc.
+    r'^Style \d+.*?:',
+    r'^Option \d+.*?:',
+    r'^Possible.*?:',
+    r'^This headline.*',
+    r'^I removed.*',
+    r'^I also.*',
+    r'^The word.*',
+    r'^\d+\.\s*\*\*.*?\*\*',  # Remove numbered options
+    r'^\d+\.\s*".*?"',  # Remove numbered quotes
+    r'^\d+\.\s+',  # Remove numbered lists
+]
+
+# Trailing commentary that runs to the end of the text
+COMMENTARY_PATTERNS = [
+    r'\(I.*?\)',  # Remove parenthetical explanations
+    r'This headline.*',
+    r'The focus is.*',
+    r'rather than.*',
+]
+
+# Only "(I removed ...)"-style asides, case-sensitive so "(including ...)" survives
+ASIDE_PATTERNS = [
+    r'(?-i:\(I\s.*?\))',
+]
+
+# Phrases after which a headline is followed by an explanation
+_EXPLANATION_MARKERS = ('this headline', 'the word', 'i removed', 'the focus')
+_EXPLANATION_SPLITS = (' This headline', ' The word', ' I removed', ' The focus', ' (I')
+
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_END = re.compile(r'[.!?]+')
+
+
+def _compile(patterns):
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), _FLAGS)
+
+
+# task -> (combined pattern, split off headline explanations)
+RULES = {
+    'headline': (_compile(PREFIX_PATTERNS + COMMENTARY_PATTERNS), True),
+    'blurb': (_compile(PREFIX_PATTERNS + ASIDE_PATTERNS), False),
+    'keyword': (_compile(PREFIX_PATTERNS), False),
+}
+
+
+def clean(text, task='headline'):
+    """Clean up LLM-generated text using the rule set for a task."""
+    if not text:
+        return "[Generation failed]"
+
+    pattern, split_explanations = RULES[task]
+    cleaned = pattern.sub('', text.strip())
+
+    # Remove quotes at the beginning and end, then collapse whitespace
+    cleaned = cleaned.strip('"').strip("'").strip()
+    cleaned = _WHITESPACE.sub(' ', cleaned)
+
+    # For headlines, take only the first sentence/phrase before explanatory text
+    if split_explanations:
+        lowered = cleaned.lower()
+        if any(marker in lowered for marker in _EXPLANATION_MARKERS):
+            for split_phrase in _EXPLANATION_SPLITS:
+                if split_phrase in cleaned:
+                    cleaned = cleaned.split(split_phrase)[0].strip()
+                    break
+
+    # Take only the first two sentences
+    sentences = _SENTENCE_END.split(cleaned)
+    if len(sentences) >= 2:
+        cleaned = '. '.join(sentences[:2]).strip() + '.'
+    elif len(sentences) == 1 and sentences[0].strip():
+        cleaned = sentences[0].strip() + '.'
+
+    return cleaned.strip()
@@ -0,0 +1,103 @@
+"""
+Persistent cache for Unsplash searches and processed photos.
+
+Search results are cached per keyword and orientation in
+CACHE_DIR/unsplash_searches.json, and resized photos are kept per photo ID,
+size and variant in CACHE_DIR/images, so a keyword like "robot" that was searched
+earlier reuses the same photo without spending the hourly API quota on a
+new search and download. Callers still trigger the photo's
+download_location endpoint on every use, as Unsplash's guidelines require.
+"""
+
+import os
+import json
+import time
+
+from config import get_settings
+from concurrency import STATE_LOCK
+
+_searches = None
+
+
+def search_key(query, is_featured=False):
+    """Build the cache key for a search (keywords are case- and whitespace-insensitive)."""
+    orientation = 'landscape' if is_featured else 'squarish'
+    return f"{' '.join(query.lower().split())}|{orientation}"
+
+
+def _load():
+    """Load the search cache from disk once per process."""
+    global _searches
+    if _searches is None:
+        try:
+            with open(get_settings().cache.unsplash_cache_file, 'r', encoding='utf-8') as f:
+                _searches = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _searches = {}
+    return _searches
+
+
+def get_search(query, is_featured=False):
+    """Return cached photo metadata for a search, or None if missing or expired."""
+    cutoff = time.time() - get_settings().cache.unsplash_search_ttl_hours * 3600
+    with STATE_LOCK:
+        entry = _load().get(search_key(query, is_featured))
+        if entry and entry['cached_at'] >= cutoff:
+            return dict(entry['photo'])
+    return None
+
+
+def put_search(query, photo, is_featured=False):
+    """Cache the photo metadata returned for a search (kept in memory until save)."""
+    with STATE_LOCK:
+        _load()[search_key(query, is_featured)] = {'photo': photo, 'cached_at': time.time()}
+
+
+def image_path(photo_id, is_featured=False, suffix='.jpg'):
+    """Return the cache path of one variant of a processed photo (see image_stage.variant_suffix)."""
+    size = 'featured' if is_featured else 'thumbnail'
+    return os.path.join(get_settings().cache.unsplash_image_dir, f"{photo_id}_{size}{suffix}")
+
+
+def cached_image(photo_id, is_featured=False, suffixes=('.jpg',)):
+    """Return True if every listed variant of a processed photo is cached and fresh."""
+    cutoff = time.time() - get_settings().cache.unsplash_image_ttl_days * 86400
+    try:
+        return all(os.path.getmtime(image_path(photo_id, is_featured, suffix)) >= cutoff for suffix in suffixes)
+    except OSError:
+        return False
+
+
+def save():
+    """Drop expired searches, then atomically write the search cache."""
+    settings = get_settings()
+    cache_file = settings.cache.unsplash_cache_file
+    search_cutoff = time.time() - settings.cache.unsplash_search_ttl_hours * 3600
+    with STATE_LOCK:
+        searches = _load()
+        for key in [k for k, v in searches.items() if v['cached_at'] < search_cutoff]:
+            del searches[key]
+
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        tmp_path = f"{cache_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(searches, f)
+        os.replace(tmp_path, cache_file)
+
+
+def prune_images():
+    """Remove processed photos older than UNSPLASH_IMAGE_TTL_DAYS.
+
+    Runs once per batch, after every category's images were copied to
+    output/, rather than from each category's save().
+    """
+    settings = get_settings().cache
+    if not os.path.isdir(settings.unsplash_image_dir):
+        return
+    cutoff = time.time() - settings.unsplash_image_ttl_days * 86400
+    for entry in os.scandir(settings.unsplash_image_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            continue